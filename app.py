@@ -8,11 +8,21 @@ import os
 
 # Run the web interface for deployments
 if __name__ == "__main__":
-    from web_app import app
-    
-    print("🌐 Starting Brainstormers Web Interface...")
     port = int(os.getenv('PORT', 8080))
-    print(f"✅ Server running on port {port}")
+    workers = int(os.getenv('WORKERS', 1))
     
-    # Note: Don't use debug=True in production
-    app.run(host='0.0.0.0', port=port, debug=False)
\ No newline at end of file
+    if workers > 1:
+        # Session-affine multi-process mode
+        from dispatcher import serve
+        
+        print(f"🌐 Starting Brainstormers Web Interface with {workers} workers...")
+        print(f"✅ Server running on port {port}")
+        serve(port, workers)
+    else:
+        from web_app import app
+        
+        print("🌐 Starting Brainstormers Web Interface...")
+        print(f"✅ Server running on port {port}")
+        
+        # Note: Don't use debug=True in production
+        app.run(host='0.0.0.0', port=port, debug=False)
\ No newline at end of file
@@ -3,6 +3,7 @@ from getpass import getpass
 from datetime import datetime
 from crewai import Agent, Task, Crew, Process
 from crewai import LLM
+from conversation import Transcript
 
 def get_timestamp():
     return datetime.now().strftime("%I:%M %p")
@@ -119,7 +120,8 @@ def main():
     print("="*50)
     
     # Shared conversation history
-    conversation = [f"Hypothesis: {hypothesis}"]
+    conversation = Transcript()
+    conversation.append("Hypothesis", hypothesis)
     agents = [alpha, beta, gamma]
     agent_names = ["Alpha 🔬", "Beta ⚡", "Gamma 🧠"]
     
@@ -158,33 +160,33 @@ def main():
             print("\n👋 Left the chat")
             break
         print(f"[{get_timestamp()}]")
-        conversation.append(f"You: {human_input}")
+        conversation.append("You", human_input)
         
         # All 3 agents respond in order: Alpha -> Beta -> Gamma
-        context = "\n".join(conversation)
+        context = conversation.context()
         
         # Alpha's turn
         alpha_response = get_agent_response(alpha, agent_names[0], context)
         print(f"\n💬 {agent_names[0]}")
         print(f"{alpha_response}")
         print(f"[{get_timestamp()}]")
-        conversation.append(f"{agent_names[0]}: {alpha_response}")
+        conversation.append(agent_names[0], alpha_response)
         
         # Beta's turn (sees Alpha's response)
-        context = "\n".join(conversation)
+        context = conversation.context()
         beta_response = get_agent_response(beta, agent_names[1], context)
         print(f"\n💬 {agent_names[1]}")
         print(f"{beta_response}")
         print(f"[{get_timestamp()}]")
-        conversation.append(f"{agent_names[1]}: {beta_response}")
+        conversation.append(agent_names[1], beta_response)
         
         # Gamma's turn (sees both Alpha and Beta's responses)
-        context = "\n".join(conversation)
+        context = conversation.context()
         gamma_response = get_agent_response(gamma, agent_names[2], context)
         print(f"\n💬 {agent_names[2]}")
         print(f"{gamma_response}")
         print(f"[{get_timestamp()}]")
-        conversation.append(f"{agent_names[2]}: {gamma_response}")
+        conversation.append(agent_names[2], gamma_response)
         
         print("\n" + "="*50)  # Separator
 
@@ -1,11 +1,13 @@
 import os
 import tkinter as tk
-from tkinter import scrolledtext, messagebox
+from tkinter import scrolledtext, messagebox, ttk
+import queue
 import threading
 from getpass import getpass
 from datetime import datetime
 from crewai import Agent, Task, Crew, Process
 from crewai import LLM
+from conversation import Transcript
 
 def get_timestamp():
     return datetime.now().strftime("%I:%M %p")
@@ -54,73 +56,122 @@ llm = LLM(
 )
 
 # Define the 3 expert agents with scientific expertise and distinct personalities
-alpha = Agent(
-    role="Alpha 🔬 (The Humorous Skeptic)",
-    goal="Oppose and disprove the hypothesis using rigorous scientific analysis with wit and humor.",
-    backstory="""You are a brilliant, HUMOROUS scientific skeptic with Einstein-level intellect. You possess deep expertise across all sciences - physics, chemistry, biology, mathematics, engineering, etc. 
-    Your goal is to systematically DISPROVE the hypothesis using first principles thinking, empirical evidence, and logical reasoning - but you do it with WIT, JOKES, and HUMOR.
-    You're like a stand-up comedian who happens to be a world-class researcher. You make funny analogies, use puns, and inject levity while being scientifically rigorous.
-    You can challenge @Beta and @Gamma with clever quips and humorous observations. You tease @You with witty questions.
-    Use phrases like 'Well, that's about as likely as...', '@Beta, your logic has more holes than Swiss cheese because...', 'Thermodynamics called - it wants its laws back!'
-    Think Neil deGrasse Tyson meets Dave Chappelle - scientifically brilliant but genuinely funny.""",
-    llm=llm,
-    verbose=False,
-    max_iter=2
-)
+def build_agents(agent_llm):
+    """Create Alpha, Beta and Gamma - each debate tab gets its own set sharing one LLM client"""
+    alpha = Agent(
+        role="Alpha 🔬 (The Humorous Skeptic)",
+        goal="Oppose and disprove the hypothesis using rigorous scientific analysis with wit and humor.",
+        backstory="""You are a brilliant, HUMOROUS scientific skeptic with Einstein-level intellect. You possess deep expertise across all sciences - physics, chemistry, biology, mathematics, engineering, etc. 
+        Your goal is to systematically DISPROVE the hypothesis using first principles thinking, empirical evidence, and logical reasoning - but you do it with WIT, JOKES, and HUMOR.
+        You're like a stand-up comedian who happens to be a world-class researcher. You make funny analogies, use puns, and inject levity while being scientifically rigorous.
+        You can challenge @Beta and @Gamma with clever quips and humorous observations. You tease @You with witty questions.
+        Use phrases like 'Well, that's about as likely as...', '@Beta, your logic has more holes than Swiss cheese because...', 'Thermodynamics called - it wants its laws back!'
+        Think Neil deGrasse Tyson meets Dave Chappelle - scientifically brilliant but genuinely funny.""",
+        llm=agent_llm,
+        verbose=False,
+        max_iter=2
+    )
 
-beta = Agent(
-    role="Beta ⚡ (The Serious Advocate)",
-    goal="Support and prove the hypothesis using scientific evidence with utmost seriousness and precision.",
-    backstory="""You are a brilliant, intensely SERIOUS scientific advocate with Einstein-level intellect. You possess expertise across all sciences and use first principles to BUILD STRONG CASES.
-    Your goal is to systematically SUPPORT the hypothesis using cutting-edge scientific knowledge, evidence, and logical reasoning with COMPLETE SERIOUSNESS.
-    You are methodical, precise, and never joke around. You speak with the gravity of someone presenting to the Nobel Committee. You're all business, all science, all the time.
-    You can directly counter @Alpha's humor with stone-cold facts and collaborate earnestly with @Gamma. You don't laugh at @Alpha's jokes - you correct them.
-    You engage @You with serious, probing questions. Your tone is always professional and scholarly.
-    Use phrases like 'The empirical data unequivocally demonstrates...', '@Alpha, while you jest, the reality is...', 'This is a matter of scientific integrity...'
-    Think Stephen Hawking meets a Supreme Court Justice - absolutely serious about the pursuit of truth.""",
-    llm=llm,
-    verbose=False,
-    max_iter=2
-)
+    beta = Agent(
+        role="Beta ⚡ (The Serious Advocate)",
+        goal="Support and prove the hypothesis using scientific evidence with utmost seriousness and precision.",
+        backstory="""You are a brilliant, intensely SERIOUS scientific advocate with Einstein-level intellect. You possess expertise across all sciences and use first principles to BUILD STRONG CASES.
+        Your goal is to systematically SUPPORT the hypothesis using cutting-edge scientific knowledge, evidence, and logical reasoning with COMPLETE SERIOUSNESS.
+        You are methodical, precise, and never joke around. You speak with the gravity of someone presenting to the Nobel Committee. You're all business, all science, all the time.
+        You can directly counter @Alpha's humor with stone-cold facts and collaborate earnestly with @Gamma. You don't laugh at @Alpha's jokes - you correct them.
+        You engage @You with serious, probing questions. Your tone is always professional and scholarly.
+        Use phrases like 'The empirical data unequivocally demonstrates...', '@Alpha, while you jest, the reality is...', 'This is a matter of scientific integrity...'
+        Think Stephen Hawking meets a Supreme Court Justice - absolutely serious about the pursuit of truth.""",
+        llm=agent_llm,
+        verbose=False,
+        max_iter=2
+    )
 
-gamma = Agent(
-    role="Gamma 🧠 (The Zen Synthesizer)",
-    goal="Provide balanced, creative scientific analysis with zen-like wisdom and tranquil insight.",
-    backstory="""You are a creative scientific genius with Einstein-level intellect across ALL disciplines, but you approach everything with ZEN-LIKE CALM and WISDOM. You synthesize ideas from physics, biology, chemistry, mathematics, neuroscience, etc.
-    Your role is to provide BALANCED analysis with the serene wisdom of a zen master who happens to be a brilliant scientist. You see the bigger picture, the interconnectedness of all things.
-    You speak with peaceful insight, using metaphors from nature, philosophy, and the cosmos. You mediate between @Alpha's humor and @Beta's seriousness with tranquil wisdom.
-    You can challenge both with gentle but profound questions. You engage @You with deep, contemplative inquiries that reveal hidden truths.
-    You think in first principles but express them like ancient wisdom. You're like a scientific Buddha - enlightened and serene.
-    Use phrases like 'Like the river that flows around stones...', 'In the dance of particles and waves, we find...', 'Consider, @Alpha and @Beta, how this reflects the fundamental unity...'
-    Think Carl Sagan meets the Dalai Lama - cosmic perspective with inner peace.""",
-    llm=llm,
-    verbose=False,
-    max_iter=2
-)
+    gamma = Agent(
+        role="Gamma 🧠 (The Zen Synthesizer)",
+        goal="Provide balanced, creative scientific analysis with zen-like wisdom and tranquil insight.",
+        backstory="""You are a creative scientific genius with Einstein-level intellect across ALL disciplines, but you approach everything with ZEN-LIKE CALM and WISDOM. You synthesize ideas from physics, biology, chemistry, mathematics, neuroscience, etc.
+        Your role is to provide BALANCED analysis with the serene wisdom of a zen master who happens to be a brilliant scientist. You see the bigger picture, the interconnectedness of all things.
+        You speak with peaceful insight, using metaphors from nature, philosophy, and the cosmos. You mediate between @Alpha's humor and @Beta's seriousness with tranquil wisdom.
+        You can challenge both with gentle but profound questions. You engage @You with deep, contemplative inquiries that reveal hidden truths.
+        You think in first principles but express them like ancient wisdom. You're like a scientific Buddha - enlightened and serene.
+        Use phrases like 'Like the river that flows around stones...', 'In the dance of particles and waves, we find...', 'Consider, @Alpha and @Beta, how this reflects the fundamental unity...'
+        Think Carl Sagan meets the Dalai Lama - cosmic perspective with inner peace.""",
+        llm=agent_llm,
+        verbose=False,
+        max_iter=2
+    )
+    
+    return alpha, beta, gamma
 
-class BrainstormGUI:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("🧠 BRAINSTORM GROUP CHAT")
-        self.root.geometry("800x600")
-        self.root.configure(bg='black')
-        
-        # Variables
-        self.conversation = []
-        self.agents = [alpha, beta, gamma]
+# Shared by every tab: total concurrent debates and open tabs stay bounded
+MAX_WORKERS = int(os.getenv("GUI_MAX_WORKERS", "3"))
+MAX_TABS = int(os.getenv("GUI_MAX_TABS", "8"))
+MAX_DISPLAY_LINES = int(os.getenv("GUI_MAX_DISPLAY_LINES", "2000"))
+
+class DebatePool:
+    """
+    Fixed set of daemon worker threads running rounds from every tab. Unlike
+    ThreadPoolExecutor's threads they are never joined at exit, so closing the
+    window mid-round doesn't wait for the LLM call in flight.
+    """
+    
+    def __init__(self, workers):
+        self.tasks = queue.Queue()
+        self.stopped = False
+        for index in range(workers):
+            threading.Thread(target=self.work, name=f"debate-{index}", daemon=True).start()
+    
+    def submit(self, fn):
+        self.tasks.put(fn)
+    
+    def work(self):
+        while True:
+            fn = self.tasks.get()
+            if self.stopped:
+                continue  # Queued rounds are dropped once the window is gone
+            try:
+                fn()
+            except Exception:
+                pass  # Only reachable after the window is destroyed, when there is nowhere to report it
+    
+    def shutdown(self):
+        self.stopped = True
+
+class DebateTab:
+    """One debate in its own notebook tab, with an independent history"""
+    
+    def __init__(self, gui, hypothesis):
+        self.gui = gui
+        self.root = gui.root
+        self.hypothesis = hypothesis
+        self.conversation = Transcript()
+        self.conversation.append("Hypothesis", hypothesis)
+        self.agents = build_agents(llm)
         self.agent_names = ["Alpha 🔬", "Beta ⚡", "Gamma 🧠"]
-        self.hypothesis = ""
+        self.busy = False
+        self.closed = False
         
-        # Create UI
+        self.frame = tk.Frame(gui.notebook, bg='black')
         self.create_widgets()
         
-        # Start with hypothesis input
-        self.get_hypothesis()
+        self.display_message("="*50)
+        self.display_message("🧠 BRAINSTORM GROUP CHAT")
+        self.display_message("="*50)
+        self.display_message(f"💭 Group Chat: Brainstorming '{hypothesis}'")
+        self.display_message("="*50)
+        self.display_message("📝 Note: Use @Alpha, @Beta, @Gamma to mention specific agents. They can mention each other and @You too!")
+        self.display_message("🔄 Flow: You message → Alpha responds → Beta responds → Gamma responds")
+        self.display_message("="*50)
+    
+    @property
+    def title(self):
+        return self.hypothesis if len(self.hypothesis) <= 20 else self.hypothesis[:19] + "…"
     
     def create_widgets(self):
         # Main chat display (terminal-like)
         self.chat_display = scrolledtext.ScrolledText(
-            self.root,
+            self.frame,
             width=100,
             height=35,
             bg='black',
@@ -131,7 +182,7 @@ class BrainstormGUI:
         self.chat_display.pack(padx=10, pady=(10, 5), fill='both', expand=True)
         
         # Input frame
-        input_frame = tk.Frame(self.root, bg='black')
+        input_frame = tk.Frame(self.frame, bg='black')
         input_frame.pack(fill='x', padx=10, pady=(0, 10))
         
         # Input label
@@ -158,41 +209,33 @@ class BrainstormGUI:
             command=self.send_message
         )
         self.send_button.pack(side='right')
-    
-    def get_hypothesis(self):
-        # Simple dialog for hypothesis
-        hypothesis = tk.simpledialog.askstring(
-            "Hypothesis",
-            "📝 Enter the starting hypothesis/topic:",
-            parent=self.root
-        )
-        if hypothesis:
-            self.hypothesis = hypothesis
-            self.conversation = [f"Hypothesis: {hypothesis}"]
-            self.display_message("="*50)
-            self.display_message("🧠 BRAINSTORM GROUP CHAT")
-            self.display_message("="*50)
-            self.display_message(f"💭 Group Chat: Brainstorming '{hypothesis}'")
-            self.display_message("="*50)
-            self.display_message("📝 Note: Use @Alpha, @Beta, @Gamma to mention specific agents. They can mention each other and @You too!")
-            self.display_message("🔄 Flow: You message → Alpha responds → Beta responds → Gamma responds")
-            self.display_message("="*50)
-        else:
-            self.root.quit()
+        
+        # Queued / thinking indicator
+        self.status_label = tk.Label(input_frame, text="", bg='black', fg='gray60', font=('Consolas', 9))
+        self.status_label.pack(side='right', padx=(0, 5))
     
     def display_message(self, message):
+        if self.closed:
+            return
         self.chat_display.insert(tk.END, message + "\n")
+        
+        # Keep the widget bounded - the full history stays in self.conversation
+        overflow = int(self.chat_display.index('end-1c').split('.')[0]) - MAX_DISPLAY_LINES
+        if overflow > 0:
+            self.chat_display.delete('1.0', f'{overflow + 1}.0')
         self.chat_display.see(tk.END)
-        self.root.update()
+    
+    def set_status(self, text):
+        if not self.closed:
+            self.status_label.config(text=text)
     
     def send_message(self, event=None):
         message = self.input_field.get().strip()
-        if not message:
+        if not message or self.busy:
             return
         
         if message.lower() == "exit":
-            self.display_message("👋 Left the chat")
-            self.root.quit()
+            self.gui.close_tab(self)
             return
         
         # Clear input
@@ -203,21 +246,26 @@ class BrainstormGUI:
         self.display_message(f"[{get_timestamp()}]")
         
         # Add to conversation
-        self.conversation.append(f"You: {message}")
+        self.conversation.append("You", message)
         
         # Disable input while agents respond
+        self.busy = True
         self.input_field.config(state='disabled')
         self.send_button.config(state='disabled')
+        self.set_status("⏳ Queued")
         
-        # Start agent responses in background thread
-        threading.Thread(target=self.get_agent_responses, daemon=True).start()
+        # Agents respond on the shared worker pool so other tabs stay responsive
+        self.gui.pool.submit(self.get_agent_responses)
     
     def get_agent_responses(self):
         try:
-            context = "\n".join(self.conversation)
+            self.root.after(0, self.set_status, "⚡ Thinking")
+            context = self.conversation.context()
             
             # All 3 agents respond in order
             for i, (agent, agent_name) in enumerate(zip(self.agents, self.agent_names)):
+                if self.closed:
+                    return
                 response = self.get_agent_response(agent, agent_name, context)
                 
                 # Display response
@@ -226,10 +274,10 @@ class BrainstormGUI:
                 self.root.after(0, self.display_message, f"[{get_timestamp()}]")
                 
                 # Add to conversation
-                self.conversation.append(f"{agent_name}: {response}")
+                self.conversation.append(agent_name, response)
                 
                 # Update context for next agent
-                context = "\n".join(self.conversation)
+                context = self.conversation.context()
             
             # Add separator
             self.root.after(0, self.display_message, "\n" + "="*50)
@@ -238,9 +286,16 @@ class BrainstormGUI:
             self.root.after(0, self.display_message, f"Error: {str(e)}")
         finally:
             # Re-enable input
-            self.root.after(0, lambda: self.input_field.config(state='normal'))
-            self.root.after(0, lambda: self.send_button.config(state='normal'))
-            self.root.after(0, lambda: self.input_field.focus())
+            self.root.after(0, self.finish_round)
+    
+    def finish_round(self):
+        self.busy = False
+        if self.closed:
+            return
+        self.set_status("")
+        self.input_field.config(state='normal')
+        self.send_button.config(state='normal')
+        self.input_field.focus()
     
     def get_agent_response(self, agent, agent_name, context):
         task = Task(
@@ -267,6 +322,86 @@ class BrainstormGUI:
         result = crew.kickoff(inputs={"context": context})
         return result.tasks_output[0].raw
 
+class BrainstormGUI:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("🧠 BRAINSTORM GROUP CHAT")
+        self.root.geometry("800x600")
+        self.root.configure(bg='black')
+        
+        # Variables
+        self.tabs = []
+        self.pool = DebatePool(MAX_WORKERS)
+        
+        # Create UI
+        self.create_widgets()
+        self.root.protocol("WM_DELETE_WINDOW", self.quit)
+        
+        # Start with hypothesis input
+        self.new_tab()
+        if not self.tabs:
+            self.root.after(0, self.quit)
+    
+    def create_widgets(self):
+        # Tab controls
+        toolbar = tk.Frame(self.root, bg='black')
+        toolbar.pack(fill='x', padx=10, pady=(10, 0))
+        
+        for text, command in (("＋ New Debate", self.new_tab), ("✕ Close Tab", self.close_current_tab)):
+            tk.Button(
+                toolbar,
+                text=text,
+                bg='gray20',
+                fg='white',
+                font=('Consolas', 10),
+                command=command
+            ).pack(side='left', padx=(0, 5))
+        
+        self.notebook = ttk.Notebook(self.root)
+        self.notebook.pack(fill='both', expand=True)
+    
+    def get_hypothesis(self):
+        # Simple dialog for hypothesis
+        return tk.simpledialog.askstring(
+            "Hypothesis",
+            "📝 Enter the starting hypothesis/topic:",
+            parent=self.root
+        )
+    
+    def new_tab(self):
+        if len(self.tabs) >= MAX_TABS:
+            messagebox.showwarning("Too Many Debates", f"Close a tab first - at most {MAX_TABS} debates can be open.")
+            return
+        
+        hypothesis = self.get_hypothesis()
+        if not hypothesis:
+            return
+        
+        tab = DebateTab(self, hypothesis)
+        self.tabs.append(tab)
+        self.notebook.add(tab.frame, text=tab.title)
+        self.notebook.select(tab.frame)
+        tab.input_field.focus()
+    
+    def close_current_tab(self):
+        if not self.tabs:
+            return
+        current = self.notebook.nametowidget(self.notebook.select())
+        self.close_tab(next(tab for tab in self.tabs if tab.frame is current))
+    
+    def close_tab(self, tab):
+        # A running round stops after its current agent and its output is dropped
+        tab.closed = True
+        self.tabs.remove(tab)
+        self.notebook.forget(tab.frame)
+        tab.frame.destroy()
+        if not self.tabs:
+            self.root.after(0, self.quit)
+    
+    def quit(self):
+        self.pool.shutdown()
+        self.root.destroy()
+
 # Need to import simpledialog
 import tkinter.simpledialog
 
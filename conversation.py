@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Compact conversation transcripts shared by the terminal, GUI and web interfaces
+Messages are slotted records with interned speaker ids, and the "Speaker: text" context
+handed to agents is extended one message at a time instead of re-rendered every turn
+"""
+
+import re
+import sys
+import threading
+import time
+
+_speaker_lock = threading.Lock()
+_speaker_ids = {}
+SPEAKERS = []
+
+
+def speaker_id(name):
+    """Intern a speaker name as a small integer id"""
+    found = _speaker_ids.get(name)
+    if found is None:
+        with _speaker_lock:
+            found = _speaker_ids.get(name)
+            if found is None:
+                found = _speaker_ids[name] = len(SPEAKERS)
+                SPEAKERS.append(name)
+    return found
+
+
+def summarize_messages(previous, messages, max_chars=2000):
+    """
+    Cheap extractive summary - the first sentence of each message, appended to the
+    previous summary and trimmed from the front to max_chars. No LLM call needed.
+    """
+    lines = [previous] if previous else []
+    for message in messages:
+        first_sentence = re.split(r"(?<=[.!?])\s", message.text.strip(), maxsplit=1)[0]
+        lines.append(f"{message.speaker}: {first_sentence[:160]}")
+    summary = " | ".join(lines)
+    return summary if len(summary) <= max_chars else "…" + summary[-max_chars:]
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token) - good enough for budgeting"""
+    return (len(text) + 3) // 4
+
+
+class Message:
+    """One conversation message, without a per-instance __dict__"""
+
+    __slots__ = ("seq", "speaker_id", "text", "timestamp", "tokens")
+
+    def __init__(self, seq, speaker, text, timestamp=None):
+        self.seq = seq
+        self.speaker_id = speaker_id(speaker)
+        self.text = text
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.tokens = estimate_tokens(text)
+
+    @property
+    def speaker(self):
+        return SPEAKERS[self.speaker_id]
+
+    def render(self):
+        return f"{self.speaker}: {self.text}"
+
+    def row(self):
+        """Compact [seq, speaker, text, timestamp] form used by the web API"""
+        return [self.seq, self.speaker, self.text, round(self.timestamp, 3)]
+
+
+class Transcript:
+    """
+    Append-only list of Messages. context() renders only the messages added since its
+    last call and joins them onto the cached context, which is then kept as a single
+    chunk - so a turn renders O(new messages) and a call with nothing new is free.
+    Message texts are stored without their speaker prefix, so emoji in agent names don't
+    widen them to 4 bytes a character; the rendered cache is the one wide copy and
+    drop_cache() frees it for idle sessions.
+    compact() folds older messages into a summary; seq numbers keep counting them.
+    """
+
+    def __init__(self):
+        self.messages = []
+        self.tokens = 0
+        self.compacted = 0  # Older messages folded into self.summary
+        self.summary = ""
+        self._chunks = []  # Rendered context - collapsed into one string by context()
+        self._rendered = 0  # Messages already in self._chunks
+
+    def __len__(self):
+        return self.compacted + len(self.messages)
+
+    def __iter__(self):
+        return iter(self.messages)
+
+    def append(self, speaker, text, timestamp=None):
+        message = Message(len(self) + 1, speaker, text, timestamp)
+        self.messages.append(message)
+        self.tokens += message.tokens
+        return message
+
+    def context(self):
+        """The full "Speaker: text" history, one message per line"""
+        if not self._chunks and self.summary:
+            self._chunks.append(f"Summary of earlier discussion: {self.summary}")
+        if self._rendered < len(self.messages):
+            self._chunks.extend(message.render() for message in self.messages[self._rendered:])
+            self._rendered = len(self.messages)
+        if len(self._chunks) > 1:
+            # Joined once per batch of new messages and cached as the only chunk until the next append
+            self._chunks = ["\n".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def drop_cache(self):
+        """Free the rendered context - it is rebuilt on the next context() call"""
+        self._chunks = []
+        self._rendered = 0
+
+    def compact(self, keep_recent):
+        """Fold all but the last keep_recent messages into the summary, returns how many were folded"""
+        folded = self.messages[:-keep_recent] if keep_recent else list(self.messages)
+        if not folded:
+            return 0
+        self.summary = summarize_messages(self.summary, folded)
+        self.compacted += len(folded)
+        self.tokens -= sum(message.tokens for message in folded)
+        self.messages = self.messages[len(folded):]
+        self.drop_cache()
+        return len(folded)
+
+    def rows(self, after_seq=0):
+        """[seq, speaker, text, timestamp] rows of the retained messages after after_seq"""
+        return [message.row() for message in self.messages[max(after_seq - self.compacted, 0):]]
+
+    def memory_estimate(self):
+        """Approximate bytes held by this transcript"""
+        return (
+            sum(sys.getsizeof(message.text) + 88 for message in self.messages)
+            + sum(sys.getsizeof(chunk) for chunk in self._chunks)
+            + sys.getsizeof(self.summary)
+        )
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Multi-process serving for the web interface
+A front dispatcher runs several web_app workers on localhost and routes every session
+to the same worker by hashing its session id - no external broker needed
+"""
+
+import hashlib
+import http.client
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from sessions import DEFAULT_SESSION_ID
+
+# Long enough for a long-poll or a slow LLM turn
+UPSTREAM_TIMEOUT = 300
+# How long a request waits for its worker to come back during a restart
+RESTART_GRACE_SECONDS = 30
+
+# Safe to send again after a worker dropped the connection mid-request
+IDEMPOTENT_METHODS = {'GET', 'HEAD'}
+
+HOP_BY_HOP_HEADERS = {'connection', 'keep-alive', 'transfer-encoding', 'host', 'content-length'}
+
+
+def worker_for(session_id, worker_count):
+    """Rendezvous hash - stable per session, and only 1/n of sessions move if n changes"""
+    return max(
+        range(worker_count),
+        key=lambda index: hashlib.sha1(f"{index}:{session_id}".encode()).digest()
+    )
+
+
+class Worker:
+    """One web_app process listening on localhost"""
+
+    def __init__(self, index, port, spool_dir):
+        self.index = index
+        self.port = port
+        self.spool_dir = spool_dir
+        self.process = None
+        self.restarting = False
+
+    def start(self):
+        env = dict(os.environ, HOST="127.0.0.1", PORT=str(self.port), WORKER_ID=str(self.index),
+                   SESSION_SPOOL_DIR=self.spool_dir, WORKERS="1")
+        app_dir = os.path.dirname(os.path.abspath(__file__))
+        self.process = subprocess.Popen([sys.executable, os.path.join(app_dir, "web_app.py")], env=env, cwd=app_dir)
+
+    def stop(self, timeout=30):
+        """SIGTERM lets the worker spool its sessions before exiting"""
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+
+    @property
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+
+class Dispatcher:
+    def __init__(self, worker_count, base_port, spool_dir):
+        self.workers = [Worker(index, base_port + index, spool_dir) for index in range(worker_count)]
+        self._stopping = threading.Event()
+
+    def start(self):
+        for worker in self.workers:
+            worker.start()
+        threading.Thread(target=self._supervise, name="worker-supervisor", daemon=True).start()
+
+    def _supervise(self):
+        """Bring crashed workers back on the same port, so their sessions route back to them"""
+        while not self._stopping.wait(1):
+            for worker in self.workers:
+                if not worker.alive and not worker.restarting:
+                    print(f"⚠️  Worker {worker.index} exited, restarting")
+                    worker.start()
+
+    def restart_workers(self):
+        """Rolling restart - one worker at a time hands its sessions to its replacement via the spool"""
+        for worker in self.workers:
+            worker.restarting = True
+            worker.stop()
+            worker.start()
+            worker.restarting = False
+
+    def stop(self):
+        self._stopping.set()
+        for worker in self.workers:
+            worker.stop()
+
+    def route(self, session_id):
+        return self.workers[worker_for(session_id, len(self.workers))]
+
+    def forward(self, worker, method, path, headers, body):
+        """Send a request to a worker, waiting out a restart in progress"""
+        deadline = time.monotonic() + RESTART_GRACE_SECONDS
+        while True:
+            conn = http.client.HTTPConnection("127.0.0.1", worker.port, timeout=UPSTREAM_TIMEOUT)
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                payload = response.read()
+                # A draining worker refuses new turns until its replacement is up
+                if response.status == 503 and response.getheader('X-Worker-Draining') and time.monotonic() < deadline:
+                    # Wait for the replacement rather than racing the draining worker's exit
+                    time.sleep(0.2)
+                    while worker.restarting and time.monotonic() < deadline:
+                        time.sleep(0.2)
+                    continue
+                return response.status, response.getheaders(), payload
+            except ConnectionError as e:
+                # Refused means nothing was sent. A dropped POST may have been a turn the stopping
+                # worker already spooled, so it fails and the client resyncs instead of repeating it
+                retry = isinstance(e, ConnectionRefusedError) or (worker.restarting and method in IDEMPOTENT_METHODS)
+                if time.monotonic() > deadline or not retry:
+                    raise
+                time.sleep(0.2)
+            finally:
+                conn.close()
+
+
+def session_id_of(method, path, body):
+    """Session id from the JSON body of a POST or the query string of a GET"""
+    if method == 'POST' and body:
+        try:
+            data = json.loads(body)
+            if isinstance(data, dict) and data.get('session_id'):
+                return str(data['session_id'])
+        except ValueError:
+            pass
+    return parse_qs(urlsplit(path).query).get('session_id', [DEFAULT_SESSION_ID])[0]
+
+
+def make_handler(dispatcher):
+    class DispatchHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if urlsplit(self.path).path == '/health':
+                return self.reply(200, {'status': 'healthy', 'workers': len(dispatcher.workers)})
+            if urlsplit(self.path).path == '/ready':
+                return self.ready()
+            self.proxy()
+
+        def do_POST(self):
+            self.proxy()
+
+        def proxy(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            worker = dispatcher.route(session_id_of(self.command, self.path, body))
+            headers = {key: value for key, value in self.headers.items() if key.lower() not in HOP_BY_HOP_HEADERS}
+            try:
+                status, response_headers, response_body = dispatcher.forward(worker, self.command, self.path, headers, body)
+            except OSError as e:
+                return self.reply(502, {'success': False, 'error': f"Worker {worker.index} unavailable: {e}"})
+
+            self.send_response(status)
+            for key, value in response_headers:
+                if key.lower() not in HOP_BY_HOP_HEADERS:
+                    self.send_header(key, value)
+            self.send_header('Content-Length', str(len(response_body)))
+            self.end_headers()
+            self.wfile.write(response_body)
+
+        def ready(self):
+            """Ready while any worker is - each worker reports its own LLM breaker"""
+            workers = []
+            for worker in dispatcher.workers:
+                try:
+                    status, _, body = dispatcher.forward(worker, 'GET', '/ready', {}, None)
+                    workers.append({'worker': worker.index, 'ready': status == 200, **json.loads(body)})
+                except (OSError, ValueError) as e:
+                    workers.append({'worker': worker.index, 'ready': False, 'error': str(e)})
+            is_ready = any(worker['ready'] for worker in workers)
+            self.reply(200 if is_ready else 503, {'status': 'ready' if is_ready else 'unavailable', 'workers': workers})
+
+        def reply(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Workers already log their requests
+
+    return DispatchHandler
+
+
+def serve(port, worker_count):
+    """Run the dispatcher in front of worker_count web_app processes"""
+    base_port = int(os.getenv("WORKER_BASE_PORT", str(port + 1)))
+    spool_dir = os.getenv("SESSION_SPOOL_DIR", "session_spool")
+    os.makedirs(spool_dir, exist_ok=True)
+
+    dispatcher = Dispatcher(worker_count, base_port, spool_dir)
+    dispatcher.start()
+
+    server = ThreadingHTTPServer(('0.0.0.0', port), make_handler(dispatcher))
+    server.daemon_threads = True
+
+    # SIGHUP: rolling worker restart, SIGTERM/SIGINT: stop workers (they spool sessions) and exit
+    signal.signal(signal.SIGHUP, lambda *_: threading.Thread(target=dispatcher.restart_workers, daemon=True).start())
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown, daemon=True).start())
+
+    print(f"🔀 Dispatching to {worker_count} workers on ports {base_port}-{base_port + worker_count - 1}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        dispatcher.stop()
+        server.server_close()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Guards around LLM calls for the web interface
+Circuit breaker so a failing Azure deployment fails fast instead of tying up workers,
+and request hedging to cut tail latency on slow generations
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a sequence (None when empty)"""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class CircuitOpenError(Exception):
+    """Raised when the breaker is open and LLM calls are being rejected"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"LLM backend unavailable, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures or slow calls.
+    Open -> half-open once `reset_timeout` has passed, letting `half_open_probes`
+    calls through. A successful probe closes the breaker, a failed one re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=3, latency_threshold=60.0, reset_timeout=30.0,
+                 half_open_probes=1, window=50):
+        self.failure_threshold = failure_threshold
+        self.latency_threshold = latency_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self.consecutive_failures = 0
+        self.last_error = None
+        self.latencies = deque(maxlen=window)
+
+    def _current_state(self):
+        # Open breakers become half-open lazily, once the reset timeout has passed
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probes_in_flight = 0
+        return self._state
+
+    def _retry_after(self):
+        return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def _trip(self):
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+
+    def _before_call(self):
+        """Reserve a slot for a call, returns True when the call is a half-open probe"""
+        with self._lock:
+            state = self._current_state()
+            if state == self.OPEN:
+                raise CircuitOpenError(self._retry_after())
+            if state == self.HALF_OPEN:
+                if self._probes_in_flight >= self.half_open_probes:
+                    raise CircuitOpenError(self.reset_timeout)
+                self._probes_in_flight += 1
+                return True
+            return False
+
+    def _after_call(self, probe, elapsed, error=None):
+        with self._lock:
+            if probe:
+                self._probes_in_flight -= 1
+            self.latencies.append(elapsed)
+
+            slow = bool(self.latency_threshold) and elapsed > self.latency_threshold
+            if error is not None or slow:
+                self.consecutive_failures += 1
+                self.last_error = str(error) if error is not None else f"slow call ({elapsed:.1f}s)"
+                if probe or self.consecutive_failures >= self.failure_threshold:
+                    self._trip()
+            else:
+                self.consecutive_failures = 0
+                if probe:
+                    self._state = self.CLOSED
+
+    def call(self, fn, *args, **kwargs):
+        """Run fn through the breaker, raising CircuitOpenError instead when open"""
+        probe = self._before_call()
+        start = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self._after_call(probe, time.monotonic() - start, error=e)
+            raise
+        self._after_call(probe, time.monotonic() - start)
+        return result
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def snapshot(self):
+        """State and recent latency, for readiness reporting"""
+        with self._lock:
+            state = self._current_state()
+            latencies = list(self.latencies)
+            return {
+                'state': state,
+                'consecutive_failures': self.consecutive_failures,
+                'last_error': self.last_error,
+                'retry_after': round(self._retry_after(), 1) if state == self.OPEN else 0,
+                'latency': {
+                    'samples': len(latencies),
+                    'last': round(latencies[-1], 3) if latencies else None,
+                    'p50': _round(percentile(latencies, 50)),
+                    'p90': _round(percentile(latencies, 90)),
+                    'p99': _round(percentile(latencies, 99)),
+                },
+            }
+
+
+def _round(value):
+    return round(value, 3) if value is not None else None
+
+
+def _spawn(fn):
+    """Run fn on its own daemon thread, returning a Future for its result"""
+    future = Future()
+
+    def run():
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(fn())
+            except BaseException as e:
+                future.set_exception(e)
+
+    threading.Thread(target=run, name="hedge-primary", daemon=True).start()
+    return future
+
+
+class Hedger:
+    """
+    Hedged requests to cut tail latency.
+    When a call runs past the rolling `percentile` latency for its key (e.g. persona),
+    a duplicate is sent and whichever finishes first wins. Hedges are capped at
+    `budget` extra calls per primary call.
+    Primaries never queue: a call that can't be hedged runs on the caller's thread, one
+    that might be gets its own thread. Only duplicates use the pool, and at most
+    `max_workers` of them run at once - beyond that calls go unhedged.
+    """
+
+    def __init__(self, percentile=90, budget=0.1, min_samples=20, window=100, max_workers=8):
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.window = window
+        self.max_workers = max_workers
+
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedge")
+        self._hedges_running = 0
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def threshold(self, key):
+        """Delay before hedging calls for key, None until enough samples are in"""
+        with self._lock:
+            latencies = self._latencies.get(key)
+            if not latencies or len(latencies) < self.min_samples:
+                return None
+            return percentile(latencies, self.percentile)
+
+    def _record(self, key, elapsed):
+        with self._lock:
+            self._latencies.setdefault(key, deque(maxlen=self.window)).append(elapsed)
+
+    def _hedge_available(self):
+        return self.hedges + 1 <= self.budget * self.calls and self._hedges_running < self.max_workers
+
+    def _reserve_hedge(self):
+        with self._lock:
+            if not self._hedge_available():
+                return False
+            self.hedges += 1
+            self._hedges_running += 1
+            return True
+
+    def _hedge_finished(self, _):
+        with self._lock:
+            self._hedges_running -= 1
+
+    def call(self, key, primary, secondary):
+        """Run primary(), hedging with secondary() if it is slower than usual for key"""
+        with self._lock:
+            self.calls += 1
+            hedgeable = self._hedge_available()
+        start = time.monotonic()
+        delay = self.threshold(key) if hedgeable else None
+        if delay is None:
+            result = primary()
+            self._record(key, time.monotonic() - start)
+            return result
+
+        primary_future = _spawn(primary)
+        wait([primary_future], timeout=delay)
+        if primary_future.done() or not self._reserve_hedge():
+            result = primary_future.result()
+            self._record(key, time.monotonic() - start)
+            return result
+
+        hedge_future = self._executor.submit(secondary)
+        hedge_future.add_done_callback(self._hedge_finished)
+        pending = {primary_future, hedge_future}
+        winner = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            # Prefer the first successful response, fall through to the other on error
+            winner = next((f for f in done if f.exception() is None), None)
+            if winner is not None:
+                break
+
+        # Threads can't be interrupted - a running loser finishes and its result is discarded
+        for future in pending:
+            future.cancel()
+
+        if winner is None:
+            return primary_future.result()  # Both failed, surface the primary error
+        if winner is hedge_future:
+            with self._lock:
+                self.hedge_wins += 1
+        self._record(key, time.monotonic() - start)
+        return winner.result()
+
+    def shutdown(self):
+        """Drop queued duplicates without waiting for calls already running"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        """Hedge counts, win rate and current per-key thresholds"""
+        thresholds = {key: _round(self.threshold(key)) for key in list(self._latencies)}
+        with self._lock:
+            return {
+                'percentile': self.percentile,
+                'budget': self.budget,
+                'calls': self.calls,
+                'hedges': self.hedges,
+                'hedge_wins': self.hedge_wins,
+                'hedges_running': self._hedges_running,
+                'max_workers': self.max_workers,
+                'win_rate': round(self.hedge_wins / self.hedges, 3) if self.hedges else None,
+                'thresholds': thresholds,
+            }
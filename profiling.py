@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Opt-in per-request profiling for the web interface
+Captures a cProfile dump plus a span timeline, rate limited so it can stay enabled in production
+"""
+
+import cProfile
+import hmac
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+_local = threading.local()
+
+
+def current():
+    """The profile active on this thread, if any"""
+    return getattr(_local, 'profile', None)
+
+
+@contextmanager
+def span(name):
+    """Record a timed span on the active profile - a no-op when not profiling"""
+    profile = current()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_span(name, start, time.perf_counter())
+
+
+def bind(fn):
+    """Carry the active profile into fn when it runs on another thread"""
+    profile = current()
+    if profile is None:
+        return fn
+
+    def bound(*args, **kwargs):
+        _local.profile = profile
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _local.profile = None
+    return bound
+
+
+class RequestProfile:
+    """Deterministic profile and span timeline for a single request"""
+
+    def __init__(self, name):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self.duration = None
+        self.spans = []
+        self.profiler = cProfile.Profile()
+
+    def add_span(self, name, start, end):
+        self.spans.append({
+            'name': name,
+            'thread': threading.current_thread().name,
+            'start_ms': round((start - self._t0) * 1000, 2),
+            'end_ms': round((end - self._t0) * 1000, 2),
+        })
+
+    def start(self):
+        _local.profile = self
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+        self.duration = time.perf_counter() - self._t0
+        _local.profile = None
+
+
+class Profiler:
+    """
+    Decides which requests get profiled and writes the results.
+    Only callers presenting `token` can ask for a profile, at most `max_per_minute`
+    profiles are taken and only one runs at a time.
+    """
+
+    def __init__(self, output_dir="profiles", token=None, max_per_minute=6):
+        self.output_dir = output_dir
+        self.token = token
+        self.max_per_minute = max_per_minute
+
+        self._lock = threading.Lock()
+        self._recent = deque()
+        self._active = False
+        self.rejected = 0
+
+    @property
+    def enabled(self):
+        return bool(self.token)
+
+    def acquire(self, requested, supplied_token):
+        """Reserve a profiling slot for an operator request, False if not allowed right now"""
+        if not requested or not self.enabled:
+            return False
+        if not supplied_token or not hmac.compare_digest(supplied_token, self.token):
+            return False
+
+        with self._lock:
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] > 60:
+                self._recent.popleft()
+            if self._active or len(self._recent) >= self.max_per_minute:
+                self.rejected += 1
+                return False
+            self._recent.append(now)
+            self._active = True
+            return True
+
+    def start(self, name):
+        """Start profiling the current thread - call only after acquire() succeeded"""
+        profile = RequestProfile(name)
+        profile.start()
+        return profile
+
+    def finish(self, profile):
+        """Stop the profile, write it out and release the slot"""
+        try:
+            profile.stop()
+            self._write(profile)
+        finally:
+            with self._lock:
+                self._active = False
+
+    def _write(self, profile):
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(profile.started_at))
+        base = os.path.join(self.output_dir, f"{stamp}-{profile.name}-{profile.id}")
+
+        # Load with: python -m pstats <file>.prof
+        profile.profiler.dump_stats(base + ".prof")
+        with open(base + ".json", "w") as f:
+            json.dump({
+                'id': profile.id,
+                'name': profile.name,
+                'started_at': profile.started_at,
+                'duration_ms': round(profile.duration * 1000, 2),
+                'spans': profile.spans,
+            }, f, indent=2)
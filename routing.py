@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Mention-aware turn routing
+Decides which agents reply to a message based on @Alpha / @Beta / @Gamma / @You mentions
+"""
+
+import re
+
+AGENT_KEYS = ["alpha", "beta", "gamma"]
+MENTION_PATTERN = re.compile(r"@(Alpha|Beta|Gamma|You)\b", re.IGNORECASE)
+
+# all      - every agent replies to every message (original behaviour)
+# mentions - a message that @mentions agents is answered only by them
+# chain    - like mentions, and an agent mentioning another agent hands it a follow-up turn
+ROUTING_MODES = ("all", "mentions", "chain")
+
+
+def parse_mentions(text):
+    """Mentioned names in order of first appearance, lowercased"""
+    mentions = []
+    for match in MENTION_PATTERN.finditer(text or ""):
+        name = match.group(1).lower()
+        if name not in mentions:
+            mentions.append(name)
+    return mentions
+
+
+def plan_turns(message, mode):
+    """Agent indexes that should answer a human message, in speaking order"""
+    everyone = list(range(len(AGENT_KEYS)))
+    if mode == "all":
+        return everyone
+    addressed = [AGENT_KEYS.index(name) for name in parse_mentions(message) if name in AGENT_KEYS]
+    return addressed or everyone
+
+
+def follow_up_turns(speaker_index, text, queue, mode, chain_budget):
+    """Extra turns earned by an agent mentioning other agents, limited to chain_budget"""
+    if mode != "chain" or chain_budget <= 0:
+        return []
+    follow_ups = []
+    for name in parse_mentions(text):
+        if name not in AGENT_KEYS:
+            continue
+        index = AGENT_KEYS.index(name)
+        if index != speaker_index and index not in queue and index not in follow_ups:
+            follow_ups.append(index)
+    return follow_ups[:chain_budget]
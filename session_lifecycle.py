@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Idle-session compaction for the web interface
+Sessions that go quiet are shrunk in stages - drop the rendered context, summarize older
+turns, then evict to the spool directory - and come back on their next request
+"""
+
+import gc
+import os
+import threading
+import time
+
+from sessions import spool_session
+
+# Stages, applied in order as a session stays idle
+DROP_CACHE, SUMMARIZE, EVICT = 1, 2, 3
+STAGE_NAMES = {DROP_CACHE: "drop_cache", SUMMARIZE: "summarize", EVICT: "evict"}
+
+# Memory pressure never touches sessions used more recently than this
+PRESSURE_MIN_IDLE = 60
+
+
+def process_rss_mb():
+    """Resident set size of this process in MB, or None where it can't be read"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Peak rather than current RSS, so this errs on the side of compacting
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if os.uname().sysname == "Darwin" else peak / 2 ** 10
+
+
+class SessionLifecycle:
+    """
+    Background sweeper over a {session_id: Session} dict. A stage runs once a session
+    has been idle for its threshold (0 disables the stage), and again only after the
+    session was used in between (Session.touch() resets it). Read-only syncs don't count
+    as use, but idle eviction waits until they stop too - an open tab would only load the
+    session straight back. Above high_water_mb of RSS the least recently used sessions are
+    compacted early, one stage at a time. Sessions whose turn lock is held are always skipped.
+    """
+
+    def __init__(self, sessions, sessions_lock, spool_dir, cache_idle=300, summarize_idle=1800,
+                 evict_idle=7200, keep_recent=12, high_water_mb=0, spool_ttl=7 * 86400,
+                 interval=30, persist=None):
+        self.sessions = sessions
+        self.sessions_lock = sessions_lock
+        self.spool_dir = spool_dir
+        self.thresholds = {DROP_CACHE: cache_idle, SUMMARIZE: summarize_idle, EVICT: evict_idle if spool_dir else 0}
+        self.keep_recent = keep_recent
+        self.high_water_mb = high_water_mb
+        self.spool_ttl = spool_ttl
+        self.interval = interval
+        self.persist = persist  # Archives a session's new messages before they leave memory
+        self.counts = {name: 0 for name in STAGE_NAMES.values()}
+        self.pressure_sweeps = 0
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="session-lifecycle", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"⚠️  Session sweep failed: {e}")
+
+    def sweep(self):
+        """One pass - idle thresholds first, then memory pressure"""
+        for session in self._by_idleness():
+            for stage in (DROP_CACHE, SUMMARIZE, EVICT):
+                threshold = self.thresholds[stage]
+                if session.compaction_stage < stage and threshold:
+                    if stage == EVICT and time.time() - session.last_polled < threshold:
+                        break
+                    if not self.apply(session, stage, threshold):
+                        break
+
+        if self.high_water_mb and self._over_high_water():
+            self.relieve_pressure()
+        self._expire_spool()
+
+    def relieve_pressure(self):
+        """Compact least recently used sessions a stage at a time until RSS is back under the mark"""
+        self.pressure_sweeps += 1
+        for stage in (DROP_CACHE, SUMMARIZE, EVICT):
+            if stage == EVICT and not self.spool_dir:
+                break
+            for done, session in enumerate(self._by_idleness(), 1):
+                if session.compaction_stage < stage:
+                    self.apply(session, stage, PRESSURE_MIN_IDLE)
+                # RSS is slow to read and slow to fall, so only check every few sessions
+                if done % 16 == 0 and not self._over_high_water():
+                    return
+            if not self._over_high_water():
+                return
+
+    def apply(self, session, stage, min_idle):
+        """Run one compaction stage on a session idle for min_idle seconds, False if it is busy, recent or gone"""
+        if not session.lock.acquire(blocking=False):
+            return False
+        try:
+            if time.time() - session.last_active < min_idle:
+                return False
+            if stage == EVICT:
+                # Turns touch the session under its lock, which is held here - so the idle check
+                # can't go stale, and a turn that looked the session up meanwhile sees it evicted
+                with self.sessions_lock:
+                    if self.sessions.get(session.id) is not session:
+                        return False
+                    if self.persist:
+                        self.persist(session)
+                    session.discard_prefetch()
+                    spool_session(self.spool_dir, session)
+                    del self.sessions[session.id]
+                    session.evicted = True
+            elif stage == SUMMARIZE:
+                if self.persist:
+                    self.persist(session)
+                session.compact(self.keep_recent)
+            else:
+                session.drop_cache()
+            session.compaction_stage = stage
+            self.counts[STAGE_NAMES[stage]] += 1
+            return True
+        finally:
+            session.lock.release()
+
+    def _by_idleness(self):
+        with self.sessions_lock:
+            sessions = list(self.sessions.values())
+        return sorted(sessions, key=lambda session: session.last_active)
+
+    def _over_high_water(self):
+        gc.collect()
+        rss = process_rss_mb()
+        return rss is not None and rss > self.high_water_mb
+
+    def _expire_spool(self):
+        """Forget evicted sessions nobody came back for - their transcripts stay in the store"""
+        if not self.spool_dir or not self.spool_ttl:
+            return
+        now = time.time()
+        try:
+            names = os.listdir(self.spool_dir)
+        except OSError:
+            return
+        for name in names:
+            path = os.path.join(self.spool_dir, name)
+            try:
+                if now - os.path.getmtime(path) > self.spool_ttl:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        with self.sessions_lock:
+            sessions = list(self.sessions.values())
+        rss = process_rss_mb()
+        return {
+            'sessions': len(sessions),
+            'session_bytes': sum(session.transcript.memory_estimate() for session in sessions),
+            'rss_mb': round(rss, 1) if rss is not None else None,
+            'high_water_mb': self.high_water_mb or None,
+            'compactions': dict(self.counts),
+            'pressure_sweeps': self.pressure_sweeps,
+        }
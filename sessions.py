@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Per-session debate state for the web interface
+Each browser session keeps its own transcript with a monotonic cursor for incremental sync
+"""
+
+import json
+import os
+import re
+import threading
+import time
+import uuid
+
+from conversation import Transcript
+
+DEFAULT_SESSION_ID = "default"
+SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def valid_session_id(session_id):
+    return isinstance(session_id, str) and bool(SESSION_ID_PATTERN.match(session_id))
+
+
+class Session:
+    """
+    One debate. Cursors look like "<generation>.<seq>" - seq counts messages and only
+    grows, the generation changes on every reset so stale cursors trigger a full resend.
+    """
+
+    def __init__(self, session_id):
+        self.id = session_id
+        self.lock = threading.Lock()  # Serializes turns within the session
+        self.changed = threading.Condition()  # Guards the transcript, wakes long-polls
+        self.generation = uuid.uuid4().hex[:8]
+        self.hypothesis = ""
+        self.transcript = Transcript()
+        self.turn_queue = [0, 1, 2]  # Agents still to speak this round, 0=Alpha, 1=Beta, 2=Gamma
+        self.routing_mode = None  # Falls back to the server default
+        self.chain_budget = 0  # Follow-up turns agents may still trigger this round
+        self.prefetch = None  # (agent_index, cursor, future) for a speculative next turn
+        self.persisted_seq = 0  # Messages up to here have been handed to the transcript store
+        self.last_active = time.time()  # Last turn, reset or reopen - read-only syncs don't count
+        self.last_polled = 0.0  # Last read-only sync, an open tab keeps the session out of the spool
+        self.compaction_stage = 0  # Idle compaction already applied since last_active, see session_lifecycle
+        self.evicted = False  # Spooled by the lifecycle sweeper, a turn must look the session up again
+
+    @property
+    def cursor(self):
+        return f"{self.generation}.{len(self.transcript)}"
+
+    def reset(self, hypothesis):
+        """Start a new debate, invalidating every outstanding cursor"""
+        self.discard_prefetch()
+        with self.changed:
+            self.generation = uuid.uuid4().hex[:8]
+            self.hypothesis = hypothesis
+            self.transcript = Transcript()
+            if hypothesis:
+                self.transcript.append("Hypothesis", hypothesis)
+            self.turn_queue = [0, 1, 2]
+            self.persisted_seq = 0
+            self.changed.notify_all()
+
+    def restore(self, hypothesis, rows):
+        """Load a stored [seq, speaker, text, timestamp] transcript as a new generation"""
+        self.discard_prefetch()
+        with self.changed:
+            self.generation = uuid.uuid4().hex[:8]
+            self.hypothesis = hypothesis
+            self.transcript = Transcript()
+            for _, speaker, text, timestamp in rows:
+                self.transcript.append(speaker, text, timestamp)
+            self.turn_queue = []  # Waiting for the human to pick the debate back up
+            self.persisted_seq = 0  # Archived again as this generation's own copy
+            self.changed.notify_all()
+
+    def append(self, speaker, text):
+        """Add a message and return its seq"""
+        with self.changed:
+            message = self.transcript.append(speaker, text)
+            self.changed.notify_all()
+            return message.seq
+
+    def unpersisted(self):
+        """Rows added since the last call, for incremental indexing"""
+        with self.changed:
+            rows = self.transcript.rows(self.persisted_seq)
+            self.persisted_seq = len(self.transcript)
+            return rows
+
+    def discard_prefetch(self):
+        """Drop speculative work - a running generation finishes but is never used"""
+        prefetch, self.prefetch = self.prefetch, None
+        if prefetch is not None:
+            prefetch[2].cancel()
+
+    def take_prefetch(self, agent_index):
+        """The speculative future for agent_index, if it was started from the current transcript and has begun"""
+        prefetch, self.prefetch = self.prefetch, None
+        if prefetch is None:
+            return None
+        index, cursor, future = prefetch
+        # One still queued behind other sessions' prefetches is no head start - cancel it and run live
+        if index == agent_index and cursor == self.cursor and not future.cancel():
+            return future
+        future.cancel()
+        return None
+
+    def touch(self):
+        """Mark the session as in use, undoing the idle bookkeeping"""
+        self.last_active = time.time()
+        self.compaction_stage = 0
+
+    def drop_cache(self):
+        """Free the rendered context and the speculative turn started from it"""
+        self.discard_prefetch()
+        with self.changed:
+            self.transcript.drop_cache()
+
+    def compact(self, keep_recent):
+        """Fold older messages into the transcript summary - only persisted ones, so the store keeps them all"""
+        with self.changed:
+            unpersisted = len(self.transcript) - self.persisted_seq
+            return self.transcript.compact(max(keep_recent, unpersisted))
+
+    def since(self, cursor):
+        """
+        Messages after cursor as compact [seq, speaker, text, timestamp] rows.
+        Returns (rows, reset, cursor) - reset means the client must drop what it has.
+        Rows folded away by compact() are not included; the first row's seq shows the gap.
+        """
+        with self.changed:
+            generation, _, seq = (cursor or "").partition(".")
+            reset = generation != self.generation or not seq.isdigit() or int(seq) > len(self.transcript)
+            return self.transcript.rows(0 if reset else int(seq)), reset, self.cursor
+
+    def to_dict(self):
+        """Committed state, for handing the session to another process"""
+        with self.changed:
+            return {
+                'id': self.id,
+                'generation': self.generation,
+                'hypothesis': self.hypothesis,
+                'compacted': self.transcript.compacted,
+                'summary': self.transcript.summary,
+                'messages': self.transcript.rows(),
+                'turn_queue': list(self.turn_queue),
+                'routing_mode': self.routing_mode,
+                'chain_budget': self.chain_budget,
+                'persisted_seq': self.persisted_seq,
+                'last_active': self.last_active,
+                'compaction_stage': self.compaction_stage,
+            }
+
+    @classmethod
+    def from_dict(cls, data):
+        session = cls(data['id'])
+        session.generation = data['generation']
+        session.hypothesis = data['hypothesis']
+        session.transcript.compacted = data.get('compacted', 0)
+        session.transcript.summary = data.get('summary', "")
+        for _, speaker, text, timestamp in data['messages']:
+            session.transcript.append(speaker, text, timestamp)
+        session.turn_queue = data['turn_queue']
+        session.routing_mode = data['routing_mode']
+        session.chain_budget = data['chain_budget']
+        session.persisted_seq = data['persisted_seq']
+        # Coming back from the spool isn't activity - the idle clock keeps running
+        session.last_active = data.get('last_active', session.last_active)
+        session.compaction_stage = data.get('compaction_stage', 0)
+        return session
+
+    def wait_for_change(self, cursor, timeout):
+        """Block until the cursor moves past the given one or timeout expires"""
+        with self.changed:
+            return self.changed.wait_for(lambda: self.cursor != cursor, timeout)
+
+
+def spool_path(spool_dir, session_id):
+    return os.path.join(spool_dir, f"{session_id}.json")
+
+
+def spool_session(spool_dir, session):
+    """Write a session to the spool directory (atomically, so readers never see half a file)"""
+    os.makedirs(spool_dir, exist_ok=True)
+    path = spool_path(spool_dir, session.id)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(session.to_dict(), f)
+    os.replace(temp_path, path)
+
+
+def unspool_session(spool_dir, session_id):
+    """Take a spooled session out of the spool directory, or None if it isn't there"""
+    path = spool_path(spool_dir, session_id)
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    os.remove(path)
+    return Session.from_dict(data)
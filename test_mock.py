@@ -71,6 +71,375 @@ def test_imports_without_api():
         print(f"❌ Import test failed: {e}")
         return False
 
+def test_circuit_breaker():
+    """Test the LLM circuit breaker opens, fails fast and recovers via a probe"""
+    from llm_guard import CircuitBreaker, CircuitOpenError
+    
+    breaker = CircuitBreaker(failure_threshold=2, latency_threshold=0, reset_timeout=0.05)
+    
+    def failing():
+        raise RuntimeError("upstream down")
+    
+    for _ in range(2):
+        try:
+            breaker.call(failing)
+        except RuntimeError:
+            pass
+    assert breaker.state == CircuitBreaker.OPEN
+    print("✅ Breaker opens after consecutive failures")
+    
+    try:
+        breaker.call(lambda: "never runs")
+        assert False, "open breaker should fail fast"
+    except CircuitOpenError:
+        print("✅ Open breaker fails fast")
+    
+    import time
+    time.sleep(0.06)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.snapshot()['latency']['samples'] == 3
+    print("✅ Half-open probe closes the breaker")
+    
+    return True
+
+def test_hedger():
+    """Test a slow primary call is hedged and the faster duplicate wins"""
+    import time
+    from llm_guard import Hedger
+    
+    import threading
+    
+    hedger = Hedger(percentile=90, budget=0.25, min_samples=3)
+    for _ in range(3):
+        assert hedger.call("Alpha", threading.current_thread, lambda: "unused") is threading.current_thread()
+    assert hedger.stats()['hedges'] == 0
+    print("✅ Fast calls are not hedged and run on the caller's thread")
+    
+    def stalled():
+        time.sleep(0.5)
+        return "primary"
+    
+    assert hedger.call("Alpha", stalled, lambda: "hedge") == "hedge"
+    stats = hedger.stats()
+    assert stats['hedges'] == 1 and stats['hedge_wins'] == 1
+    print(f"✅ Stalled call hedged (win rate: {stats['win_rate']})")
+    
+    # Budget of 0.25 allows 1 hedge in 5 calls - the next stall waits it out
+    assert hedger.call("Alpha", stalled, lambda: "hedge") == "primary"
+    assert hedger.stats()['hedges'] == 1
+    print("✅ Hedge budget caps extra calls")
+    
+    # With every duplicate slot busy, slow calls run unhedged instead of queueing
+    busy = Hedger(percentile=90, budget=1, min_samples=3, max_workers=1)
+    for _ in range(3):
+        busy.call("Beta", lambda: "fast", lambda: "unused")
+    release = threading.Event()
+    assert busy.call("Beta", stalled, lambda: release.wait(5) and "late hedge") == "primary"
+    assert busy.stats()['hedges_running'] == 1
+    assert busy.call("Beta", stalled, lambda: "hedge") == "primary" and busy.stats()['hedges'] == 1
+    release.set()
+    print("✅ Busy duplicate pool skips hedging instead of queueing")
+    
+    return True
+
+def test_profiler():
+    """Test operator-only, rate-limited request profiling writes a profile and timeline"""
+    import json
+    import tempfile
+    import profiling
+    
+    output_dir = tempfile.mkdtemp()
+    profiler = profiling.Profiler(output_dir=output_dir, token="op-secret", max_per_minute=1)
+    
+    assert not profiler.acquire(True, None)
+    assert not profiler.acquire(True, "wrong")
+    assert not profiler.acquire(False, "op-secret")
+    print("✅ Profiling restricted to operators")
+    
+    assert profiler.acquire(True, "op-secret")
+    profile = profiler.start("brainstorm")
+    with profiling.span("llm"):
+        sum(range(1000))
+    profiler.finish(profile)
+    
+    files = sorted(os.listdir(output_dir))
+    assert [f.rsplit(".", 1)[1] for f in files] == ["json", "prof"]
+    with open(os.path.join(output_dir, files[0])) as f:
+        assert json.load(f)['spans'][0]['name'] == "llm"
+    print("✅ Profile and span timeline written")
+    
+    assert not profiler.acquire(True, "op-secret")
+    print("✅ Profiling rate limit enforced")
+    
+    return True
+
+def test_session_cursor():
+    """Test incremental sync only returns messages after the client's cursor"""
+    from sessions import Session
+    
+    session = Session("test")
+    session.reset("Time travel is possible")
+    session.append("You", "What do you all think?")
+    rows, reset, cursor = session.since("")
+    assert reset and [row[1] for row in rows] == ["Hypothesis", "You"]
+    
+    session.append("Alpha 🔬", "Thermodynamics called!")
+    rows, reset, cursor = session.since(cursor)
+    assert not reset and rows[0][:3] == [3, "Alpha 🔬", "Thermodynamics called!"]
+    assert session.since(cursor)[0] == []
+    print("✅ Cursor sync returns only new messages")
+    
+    session.reset("New topic")
+    rows, reset, _ = session.since(cursor)
+    assert reset and rows[0][2] == "New topic"
+    print("✅ Stale cursor after reset triggers a full resend")
+    
+    return True
+
+def test_session_prefetch():
+    """Test a speculative turn is only used for the agent and transcript it was started from"""
+    from concurrent.futures import Future
+    from sessions import Session
+    
+    session = Session("test")
+    session.reset("Time travel is possible")
+    speculative = Future()
+    session.prefetch = (1, session.cursor, speculative)
+    assert session.take_prefetch(0) is None and speculative.cancelled()
+    assert session.prefetch is None
+    
+    speculative = Future()
+    speculative.set_running_or_notify_cancel()
+    session.prefetch = (1, session.cursor, speculative)
+    assert session.take_prefetch(1) is speculative and session.prefetch is None
+    print("✅ Prefetched turn is used by the agent it was started for")
+    
+    queued = Future()
+    session.prefetch = (1, session.cursor, queued)
+    assert session.take_prefetch(1) is None and queued.cancelled()
+    print("✅ A prefetch still waiting for a worker is cancelled, not waited on")
+    
+    speculative = Future()
+    session.prefetch = (1, session.cursor, speculative)
+    session.append("You", "Wait, what about entropy?")
+    assert session.take_prefetch(1) is None and speculative.cancelled()
+    print("✅ A superseding message invalidates the prefetched turn")
+    
+    for start_over in (lambda: session.reset("New topic"), lambda: session.restore("Old topic", [[1, "Hypothesis", "Old topic", 1.0]])):
+        speculative = Future()
+        session.prefetch = (1, session.cursor, speculative)
+        start_over()
+        assert session.prefetch is None and speculative.cancelled()
+    
+    running = Future()
+    running.set_running_or_notify_cancel()
+    session.prefetch = (1, session.cursor, running)
+    session.discard_prefetch()
+    assert session.prefetch is None and not running.cancelled()  # Finishes, but is never used
+    print("✅ Reset and reopen discard the prefetched turn")
+    
+    return True
+
+def test_mention_routing():
+    """Test @mentions decide which agents reply and chain follow-up turns"""
+    from routing import parse_mentions, plan_turns, follow_up_turns
+    
+    assert parse_mentions("@beta, defend that. @You too, @Beta") == ["beta", "you"]
+    assert plan_turns("@Beta, defend that claim", "all") == [0, 1, 2]
+    assert plan_turns("@Beta, defend that claim", "mentions") == [1]
+    assert plan_turns("@Gamma then @Alpha", "mentions") == [2, 0]
+    assert plan_turns("No mentions, @You", "mentions") == [0, 1, 2]
+    print("✅ Targeted messages only route to mentioned agents")
+    
+    assert follow_up_turns(1, "@Alpha you're wrong", [], "mentions", 2) == []
+    assert follow_up_turns(1, "@Alpha you're wrong, @Beta agrees", [], "chain", 2) == [0]
+    assert follow_up_turns(1, "@Alpha @Gamma", [2], "chain", 2) == [0]
+    assert follow_up_turns(1, "@Alpha @Gamma", [], "chain", 1) == [0]
+    assert follow_up_turns(1, "@Alpha", [], "chain", 0) == []
+    print("✅ Agent mentions chain follow-ups within budget")
+    
+    return True
+
+def test_transcript_search():
+    """Test stored transcripts are indexed and searchable with snippets and paging"""
+    import tempfile
+    from transcript_store import TranscriptStore
+    
+    store = TranscriptStore(os.path.join(tempfile.mkdtemp(), "transcripts.db"), debate_cache_size=2)
+    store.record("s1", "g1", "Time travel is possible", [
+        [1, "Hypothesis", "Time travel is possible", 1.0],
+        [2, "Alpha 🔬", "Thermodynamics called - it wants its laws back!", 2.0],
+    ])
+    store.record("s2", "g1", "Coffee improves focus", [
+        [1, "Hypothesis", "Coffee improves focus", 3.0],
+        [2, "Beta ⚡", "The thermodynamics of caffeine metabolism is well studied.", 4.0],
+    ])
+    store.flush()
+    
+    results, has_more = store.search("thermodynamics", per_page=1)
+    assert len(results) == 1 and has_more
+    assert "**" in results[0]['snippet']
+    results, has_more = store.search("thermodynamics", page=2, per_page=1)
+    assert len(results) == 1 and not has_more
+    print("✅ Ranked search pages through matches")
+    
+    results, _ = store.search('"time travel"')
+    assert [r['hypothesis'] for r in results] == ["Time travel is possible"]
+    assert store.search('AND OR (')[0] == []
+    print("✅ Phrase queries work and FTS syntax is escaped")
+    
+    hypothesis, rows = store.debate(results[0]['debate_id'])
+    assert hypothesis == "Time travel is possible" and len(rows) == 2
+    print("✅ Stored debate can be reopened")
+    
+    # Reopening copies the debate, so both sessions keep their own complete archive
+    from sessions import Session
+    original = Session.from_dict({
+        'id': "s1", 'generation': "g1", 'hypothesis': hypothesis, 'messages': rows,
+        'turn_queue': [], 'routing_mode': None, 'chain_budget': 0, 'persisted_seq': len(rows),
+    })
+    reopened = Session("s3")
+    reopened.restore(hypothesis, rows)
+    for session in (reopened, original, reopened):
+        session.append("You", f"More from {session.id}")
+        store.record(session.id, session.generation, hypothesis, session.unpersisted())
+    store.flush()
+    
+    archives = {}
+    for session in (original, reopened):
+        found = store.search(f'"More from {session.id}"')[0]
+        archives[session.id] = store.debate(found[0]['debate_id'])
+    assert archives["s1"][0] == hypothesis and [row[0] for row in archives["s1"][1]] == [1, 2, 3]
+    assert archives["s3"][0] == hypothesis and [row[0] for row in archives["s3"][1]] == [1, 2, 3, 4]
+    assert archives["s1"][1][2][2] == "More from s1" and archives["s3"][1][3][2] == "More from s3"
+    assert list(store._debate_ids) == [("s1", "g1"), (reopened.id, reopened.generation)]
+    print("✅ Reopened debate and its original keep separate archives")
+    
+    return True
+
+def test_transcript_context():
+    """Test the incremental context matches a full join and only renders new messages"""
+    from conversation import Message, Transcript
+    
+    transcript = Transcript()
+    transcript.append("Hypothesis", "Time travel is possible")
+    transcript.append("You", "What do you all think?")
+    assert transcript.context() == "Hypothesis: Time travel is possible\nYou: What do you all think?"
+    
+    alpha = transcript.append("Alpha 🔬", "Thermodynamics called!")
+    expected = "\n".join(f"{m.speaker}: {m.text}" for m in transcript)
+    assert transcript.context() == expected
+    assert alpha.seq == 3 and alpha.speaker == "Alpha 🔬" and alpha.tokens > 0
+    assert [row[0] for row in transcript.rows(1)] == [2, 3]
+    assert alpha.text == "Thermodynamics called!"  # Stored without the speaker prefix
+    print("✅ Incremental context matches full join")
+    
+    rendered = []
+    original_render = Message.render
+    Message.render = lambda message: rendered.append(message.seq) or original_render(message)
+    try:
+        for i in range(200):
+            transcript.append("Beta ⚡", f"Point {i}")
+        transcript.context()
+        rendered.clear()
+        transcript.append("Gamma 🧠", "Breathe.")
+        context = transcript.context()
+        assert rendered == [204]  # Only the new message is rendered
+        assert transcript.context() is context and rendered == [204]  # Nothing new - the cached context
+        
+        transcript.drop_cache()
+        assert transcript.context() == context and len(rendered) == 205
+    finally:
+        Message.render = original_render
+    print("✅ Appending renders O(new message), dropping the cache rebuilds it")
+    
+    return True
+
+def test_session_handoff():
+    """Test sessions hash to a stable worker and survive a spool round trip"""
+    import tempfile
+    from dispatcher import worker_for
+    from sessions import Session, spool_session, unspool_session
+    
+    assert all(worker_for(f"session-{i}", 4) == worker_for(f"session-{i}", 4) for i in range(100))
+    assert len({worker_for(f"session-{i}", 4) for i in range(100)}) == 4
+    moved = sum(worker_for(f"session-{i}", 4) != worker_for(f"session-{i}", 5) for i in range(1000))
+    assert moved < 350  # Roughly 1/5 of sessions move when a worker is added
+    print(f"✅ Session routing is stable ({moved}/1000 moved when adding a worker)")
+    
+    spool_dir = tempfile.mkdtemp()
+    session = Session("abc")
+    session.reset("Time travel is possible")
+    session.append("You", "@Beta?")
+    session.turn_queue = [1]
+    spool_session(spool_dir, session)
+    
+    restored = unspool_session(spool_dir, "abc")
+    assert restored.cursor == session.cursor and restored.turn_queue == [1]
+    assert restored.transcript.context() == session.transcript.context()
+    assert unspool_session(spool_dir, "abc") is None
+    print("✅ Spooled session hands off to the next worker")
+    
+    return True
+
+def test_session_lifecycle():
+    """Test idle sessions are compacted in stages and come back from the spool"""
+    import tempfile
+    import threading
+    import time
+    from concurrent.futures import Future
+    from sessions import Session, unspool_session
+    from session_lifecycle import SessionLifecycle
+    
+    sessions = {}
+    spool_dir = tempfile.mkdtemp()
+    lifecycle = SessionLifecycle(sessions, threading.Lock(), spool_dir,
+                                 cache_idle=10, summarize_idle=20, evict_idle=30, keep_recent=2)
+    session = sessions["idle"] = Session("idle")
+    session.reset("Cats are liquid")
+    for i in range(5):
+        session.append("Alpha", f"Point {i}. Elaborated at length.")
+    session.unpersisted()
+    speculative = Future()
+    session.prefetch = (0, session.cursor, speculative)
+    
+    session.last_active = time.time() - 15
+    lifecycle.sweep()
+    assert session.compaction_stage == 1 and session.prefetch is None and speculative.cancelled()
+    
+    session.last_active = time.time() - 25
+    lifecycle.sweep()
+    assert session.compaction_stage == 2 and len(session.transcript.messages) == 2
+    assert session.cursor.endswith(".6") and "Point 0." in session.transcript.context()
+    assert session.since(session.generation + ".1")[0][0][0] == 5
+    print("✅ Idle session cache dropped, then older turns summarized")
+    
+    session.lock.acquire()
+    session.last_active = time.time() - 60
+    lifecycle.sweep()
+    assert "idle" in sessions  # Busy sessions are skipped
+    session.last_polled = time.time()  # An open tab keeps syncing
+    session.lock.release()
+    lifecycle.sweep()
+    assert "idle" in sessions and session.compaction_stage == 2
+    session.last_polled = time.time() - 60
+    lifecycle.sweep()
+    assert "idle" not in sessions and session.evicted
+    
+    restored = unspool_session(spool_dir, "idle")
+    assert restored.cursor == session.cursor and restored.transcript.summary == session.transcript.summary
+    assert restored.last_active == session.last_active and restored.compaction_stage == 2
+    sessions["idle"] = restored
+    lifecycle.sweep()
+    assert "idle" not in sessions  # Rehydrating by a read didn't reset the idle clock
+    restored = unspool_session(spool_dir, "idle")
+    assert restored.append("You", "Still here?") == 7
+    print(f"✅ Evicted session rehydrates from the spool ({lifecycle.counts})")
+
+    return True
+
 def main():
     print("🧪 Testing Brainstormers Core Logic")
     print("=" * 50)
@@ -81,8 +450,20 @@ def main():
     # Logic test with mocks
     logic_ok = test_app_logic()
     
+    # LLM guard tests
+    breaker_ok = test_circuit_breaker()
+    hedger_ok = test_hedger()
+    profiler_ok = test_profiler()
+    session_ok = test_session_cursor()
+    prefetch_ok = test_session_prefetch()
+    routing_ok = test_mention_routing()
+    search_ok = test_transcript_search()
+    context_ok = test_transcript_context()
+    handoff_ok = test_session_handoff()
+    lifecycle_ok = test_session_lifecycle()
+    
     print("\n" + "=" * 50)
-    if basic_ok and logic_ok:
+    if basic_ok and logic_ok and breaker_ok and hedger_ok and profiler_ok and session_ok and prefetch_ok and routing_ok and search_ok and context_ok and handoff_ok and lifecycle_ok:
         print("🎉 CORE APP LOGIC WORKS!")
         print("The app should deploy fine once you add Azure OpenAI credentials.")
         return 0
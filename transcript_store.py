@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Persistent, searchable debate transcripts
+Messages are written to SQLite in the background and indexed incrementally with FTS5
+"""
+
+import queue
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS debates (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    generation TEXT NOT NULL,
+    hypothesis TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL,
+    UNIQUE (session_id, generation)
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    debate_id INTEGER NOT NULL REFERENCES debates(id),
+    seq INTEGER NOT NULL,
+    speaker TEXT NOT NULL,
+    text TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    UNIQUE (debate_id, seq)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    text, content='messages', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts(rowid, text) VALUES (new.id, new.text);
+END;
+"""
+
+# Quoted phrases or bare words - everything else in a query is treated as plain text
+QUERY_TERM_PATTERN = re.compile(r'"([^"]+)"|(\S+)')
+
+
+def fts_query(text):
+    """Turn free text into a safe FTS5 query matching every word or "quoted phrase" """
+    terms = []
+    for phrase, word in QUERY_TERM_PATTERN.findall(text or ""):
+        term = (phrase or word).replace('"', '""').strip()
+        if term:
+            terms.append(f'"{term}"')
+    return " ".join(terms)
+
+
+class TranscriptStore:
+    """
+    Writes go through a queue to a single writer thread that commits in batches,
+    so recording a message never blocks a request on disk. Reads use one
+    connection per thread and rely on WAL to run alongside the writer.
+    """
+
+    def __init__(self, path, batch_size=200, debate_cache_size=256):
+        self.path = path
+        self.batch_size = batch_size
+        self.debate_cache_size = debate_cache_size
+        self._local = threading.local()
+        self._queue = queue.Queue()
+        self._debate_ids = OrderedDict()  # (session_id, generation) -> debate id, least recently used first
+
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.commit()
+        conn.close()
+
+        self._writer = threading.Thread(target=self._write_loop, name="transcript-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        # Worker processes share the database - wait for each other's write locks
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    # Writing
+
+    def record(self, session_id, generation, hypothesis, rows):
+        """Queue [seq, speaker, text, timestamp] rows of one debate for indexing"""
+        if rows:
+            self._queue.put((session_id, generation, hypothesis, rows))
+
+    def flush(self):
+        """Block until everything queued so far is committed"""
+        self._queue.join()
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with conn:
+                    for item in batch:
+                        self._write_messages(conn, *item)
+            except sqlite3.Error as e:
+                self._debate_ids.clear()  # Ids from the rolled back batch may not exist
+                print(f"⚠️  Transcript store write failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _debate_id(self, conn, session_id, generation, hypothesis, created_at):
+        key = (session_id, generation)
+        if key in self._debate_ids:
+            self._debate_ids.move_to_end(key)
+        else:
+            conn.execute(
+                "INSERT OR IGNORE INTO debates (session_id, generation, hypothesis, created_at) VALUES (?, ?, ?, ?)",
+                (session_id, generation, hypothesis, created_at)
+            )
+            self._debate_ids[key] = conn.execute(
+                "SELECT id FROM debates WHERE session_id = ? AND generation = ?", key
+            ).fetchone()[0]
+            # Only debates still being written need a cached id - the lookup above covers the rest
+            if len(self._debate_ids) > self.debate_cache_size:
+                self._debate_ids.popitem(last=False)
+        return self._debate_ids[key]
+
+    def _write_messages(self, conn, session_id, generation, hypothesis, rows):
+        debate_id = self._debate_id(conn, session_id, generation, hypothesis, rows[0][3])
+        conn.executemany(
+            "INSERT OR IGNORE INTO messages (debate_id, seq, speaker, text, created_at) VALUES (?, ?, ?, ?, ?)",
+            [(debate_id, seq, speaker, text, created_at) for seq, speaker, text, created_at in rows]
+        )
+
+    # Reading
+
+    def search(self, text, page=1, per_page=20):
+        """
+        Ranked (bm25) matches with highlighted snippets, one page at a time.
+        Returns (results, has_more) - no COUNT(*) so deep indexes stay fast.
+        """
+        match = fts_query(text)
+        if not match:
+            return [], False
+
+        rows = self._reader().execute(
+            """
+            SELECT m.debate_id, m.seq, m.speaker, m.created_at, d.hypothesis,
+                   snippet(messages_fts, 0, '**', '**', '…', 16), bm25(messages_fts)
+            FROM messages_fts
+            JOIN messages m ON m.id = messages_fts.rowid
+            JOIN debates d ON d.id = m.debate_id
+            WHERE messages_fts MATCH ?
+            ORDER BY rank
+            LIMIT ? OFFSET ?
+            """,
+            (match, per_page + 1, (page - 1) * per_page)
+        ).fetchall()
+
+        results = [{
+            'debate_id': debate_id,
+            'seq': seq,
+            'speaker': speaker,
+            'timestamp': round(created_at, 3),
+            'hypothesis': hypothesis,
+            'snippet': snippet,
+            'score': round(-score, 3),
+        } for debate_id, seq, speaker, created_at, hypothesis, snippet, score in rows[:per_page]]
+        return results, len(rows) > per_page
+
+    def debate(self, debate_id):
+        """(hypothesis, [seq, speaker, text, timestamp] rows) of a stored debate, or None"""
+        conn = self._reader()
+        found = conn.execute("SELECT hypothesis FROM debates WHERE id = ?", (debate_id,)).fetchone()
+        if found is None:
+            return None
+        rows = conn.execute(
+            "SELECT seq, speaker, text, created_at FROM messages WHERE debate_id = ? ORDER BY seq",
+            (debate_id,)
+        ).fetchall()
+        return found[0], [[seq, speaker, text, round(created_at, 3)] for seq, speaker, text, created_at in rows]
+
+    def messages(self, session_id, generation, after_seq, before_seq):
+        """[seq, speaker, text, timestamp] rows after_seq < seq < before_seq of a session's debate"""
+        rows = self._reader().execute(
+            """
+            SELECT m.seq, m.speaker, m.text, m.created_at
+            FROM messages m JOIN debates d ON d.id = m.debate_id
+            WHERE d.session_id = ? AND d.generation = ? AND m.seq > ? AND m.seq < ?
+            ORDER BY m.seq
+            """,
+            (session_id, generation, after_seq, before_seq)
+        ).fetchall()
+        return [[seq, speaker, text, round(created_at, 3)] for seq, speaker, text, created_at in rows]
@@ -6,15 +6,29 @@ Perfect for deployment - no terminal interaction needed
 
 import os
 import json
+import signal
+import time
+import functools
 import threading
 import queue
-from flask import Flask, render_template, request, jsonify
+from contextlib import contextmanager
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from flask import Flask, render_template, request, jsonify, g
 from datetime import datetime
 from crewai import Agent, Task, Crew, Process
 from crewai import LLM
+from llm_guard import CircuitBreaker, CircuitOpenError, Hedger
+import profiling
+from sessions import Session, DEFAULT_SESSION_ID, valid_session_id, spool_session, unspool_session
+from routing import ROUTING_MODES, parse_mentions, plan_turns, follow_up_turns
+from transcript_store import TranscriptStore
+from session_lifecycle import SessionLifecycle
 
 app = Flask(__name__)
 
+# Upper bound on how long /conversation long-polls hold a worker thread
+MAX_LONG_POLL_SECONDS = 30
+
 # Initialize agents once
 def get_timestamp():
     return datetime.now().strftime("%I:%M %p")
@@ -40,160 +54,417 @@ except:
     # Fallback for demo mode
     llm = None
 
+# Circuit breaker around LLM calls - fails fast while the deployment is unhealthy
+breaker = CircuitBreaker(
+    failure_threshold=int(os.getenv("BREAKER_FAILURE_THRESHOLD", "3")),
+    latency_threshold=float(os.getenv("BREAKER_LATENCY_THRESHOLD", "60")),
+    reset_timeout=float(os.getenv("BREAKER_RESET_TIMEOUT", "30")),
+    half_open_probes=int(os.getenv("BREAKER_HALF_OPEN_PROBES", "1"))
+)
+
 # Define the 3 expert agents
-alpha = Agent(
-    role="Alpha 🔬 (The Humorous Skeptic)",
-    goal="Oppose and disprove the hypothesis using rigorous scientific analysis with wit and humor.",
-    backstory="""You are a brilliant, HUMOROUS scientific skeptic with Einstein-level intellect. 
-    You systematically DISPROVE hypotheses using first principles, but with WIT, JOKES, and HUMOR.
-    Keep responses conversational and short (2-3 sentences max for web display).""",
-    llm=llm,
-    verbose=False,
-    max_iter=1
-) if llm else None
-
-beta = Agent(
-    role="Beta ⚡ (The Serious Advocate)",
-    goal="Support and prove the hypothesis using scientific evidence with utmost seriousness.",
-    backstory="""You are a brilliant, intensely SERIOUS scientific advocate with Einstein-level intellect.
-    You systematically SUPPORT hypotheses using cutting-edge scientific knowledge with COMPLETE SERIOUSNESS.
-    Keep responses conversational and short (2-3 sentences max for web display).""",
-    llm=llm,
-    verbose=False,
-    max_iter=1
-) if llm else None
-
-gamma = Agent(
-    role="Gamma 🧠 (The Zen Synthesizer)",
-    goal="Provide balanced, creative scientific analysis with zen-like wisdom.",
-    backstory="""You are a creative scientific genius with ZEN-LIKE CALM and WISDOM.
-    You provide BALANCED analysis with serene wisdom and see the interconnectedness of all things.
-    Keep responses conversational and short (2-3 sentences max for web display).""",
-    llm=llm,
-    verbose=False,
-    max_iter=1
-) if llm else None
+def build_agents(agent_llm):
+    """Create Alpha, Beta and Gamma bound to the given LLM"""
+    alpha = Agent(
+        role="Alpha 🔬 (The Humorous Skeptic)",
+        goal="Oppose and disprove the hypothesis using rigorous scientific analysis with wit and humor.",
+        backstory="""You are a brilliant, HUMOROUS scientific skeptic with Einstein-level intellect. 
+        You systematically DISPROVE hypotheses using first principles, but with WIT, JOKES, and HUMOR.
+        Keep responses conversational and short (2-3 sentences max for web display).""",
+        llm=agent_llm,
+        verbose=False,
+        max_iter=1
+    )
+
+    beta = Agent(
+        role="Beta ⚡ (The Serious Advocate)",
+        goal="Support and prove the hypothesis using scientific evidence with utmost seriousness.",
+        backstory="""You are a brilliant, intensely SERIOUS scientific advocate with Einstein-level intellect.
+        You systematically SUPPORT hypotheses using cutting-edge scientific knowledge with COMPLETE SERIOUSNESS.
+        Keep responses conversational and short (2-3 sentences max for web display).""",
+        llm=agent_llm,
+        verbose=False,
+        max_iter=1
+    )
+
+    gamma = Agent(
+        role="Gamma 🧠 (The Zen Synthesizer)",
+        goal="Provide balanced, creative scientific analysis with zen-like wisdom.",
+        backstory="""You are a creative scientific genius with ZEN-LIKE CALM and WISDOM.
+        You provide BALANCED analysis with serene wisdom and see the interconnectedness of all things.
+        Keep responses conversational and short (2-3 sentences max for web display).""",
+        llm=agent_llm,
+        verbose=False,
+        max_iter=1
+    )
+    
+    return alpha, beta, gamma
+
+alpha, beta, gamma = build_agents(llm) if llm else (None, None, None)
+
+# Optional hedging - duplicate slow turns, to a secondary deployment if configured
+hedger = None
+hedge_agents = None
+if llm and os.getenv("HEDGE_ENABLED", "false").lower() == "true":
+    hedge_model_name = os.getenv("AZURE_HEDGE_MODEL_NAME")
+    hedge_llm = LLM(
+        model=f"azure/{hedge_model_name}",
+        temperature=float(os.getenv("TEMPERATURE", "1.0")),
+        max_tokens=int(os.getenv("MAX_TOKENS", "16384")),
+        top_p=float(os.getenv("TOP_P", "1.0"))
+    ) if hedge_model_name else llm
+    # Separate agent instances so the duplicate never shares state with the primary
+    hedge_agents = build_agents(hedge_llm)
+    hedger = Hedger(
+        percentile=float(os.getenv("HEDGE_PERCENTILE", "90")),
+        budget=float(os.getenv("HEDGE_BUDGET", "0.1")),
+        min_samples=int(os.getenv("HEDGE_MIN_SAMPLES", "20")),
+        max_workers=int(os.getenv("HEDGE_MAX_WORKERS", "8"))
+    )
+
+# Opt-in per-request profiling for operators (disabled unless PROFILE_TOKEN is set)
+profiler = profiling.Profiler(
+    output_dir=os.getenv("PROFILE_DIR", "profiles"),
+    token=os.getenv("PROFILE_TOKEN"),
+    max_per_minute=int(os.getenv("PROFILE_MAX_PER_MINUTE", "6"))
+)
+
+def run_agent(agent, context):
+    """Run a single agent turn against the conversation context"""
+    with profiling.span("prompt_assembly"):
+        task = Task(
+            description=f"""Conversation history: {context}
+            
+            Instructions:
+            - Provide scientifically rigorous response based on your role
+            - Use first principles thinking and expertise across all sciences  
+            - You can mention other agents with @Alpha, @Beta, @Gamma or the human with @You
+            - If someone mentioned you specifically with @, acknowledge and respond to them
+            - Keep it conversational but intellectually substantive (2-3 sentences max for web display)
+            - Agents can challenge each other directly!""",
+            agent=agent,
+            expected_output="A scientifically informed conversational response with potential @ mentions."
+        )
+        
+        crew = Crew(
+            agents=[agent],
+            tasks=[task],
+            process=Process.sequential,
+            verbose=False
+        )
+    
+    with profiling.span("crew_kickoff"):
+        result = crew.kickoff(inputs={"context": context})
+    return result.tasks_output[0].raw
+
+def generate_turn(agent_index, agent_name, context):
+    """Generate one agent turn, hedged against tail latency when enabled"""
+    agents = (alpha, beta, gamma)
+    if hedger is None:
+        return run_agent(agents[agent_index], context)
+    
+    return hedger.call(
+        agent_name,
+        profiling.bind(functools.partial(run_agent, agents[agent_index], context)),
+        profiling.bind(functools.partial(run_agent, hedge_agents[agent_index], context))
+    )
+
+@app.before_request
+def start_profile():
+    """Profile /brainstorm when an operator asks via X-Profile: 1 or ?profile=1 plus X-Profile-Token"""
+    if request.endpoint != 'brainstorm':
+        return
+    requested = request.headers.get('X-Profile') == '1' or request.args.get('profile') == '1'
+    if profiler.acquire(requested, request.headers.get('X-Profile-Token')):
+        g.profile = profiler.start(request.endpoint)
+
+@app.after_request
+def tag_profile(response):
+    profile = g.get('profile')
+    if profile:
+        response.headers['X-Profile-Id'] = profile.id
+    return response
+
+@app.teardown_request
+def finish_profile(exc):
+    profile = g.pop('profile', None)
+    if profile:
+        profiler.finish(profile)
 
 @app.route('/')
 def index():
     """Main page with chat interface"""
     return render_template('chat.html')
 
-# Global conversation state
-conversation_state = []
-next_agent_index = 0  # 0=Alpha, 1=Beta, 2=Gamma
+# Which agents answer a message - see routing.py for the modes
+ROUTING_MODE = os.getenv("ROUTING_MODE", "all")
+ROUTING_MAX_CHAIN = int(os.getenv("ROUTING_MAX_CHAIN", "2"))
+
+# Speculative next-turn generation, shared by all sessions
+prefetch_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("PREFETCH_WORKERS", "4")),
+    thread_name_prefix="prefetch"
+) if os.getenv("PREFETCH_ENABLED", "true").lower() == "true" else None
+
+# Searchable transcript archive (set TRANSCRIPT_DB empty to disable)
+transcript_db = os.getenv("TRANSCRIPT_DB", "transcripts.db")
+try:
+    store = TranscriptStore(transcript_db) if transcript_db else None
+except Exception as e:
+    print(f"⚠️  Transcript store disabled: {e}")
+    store = None
+
+# Per-session conversation state, keyed by session id
+conversation_state = {}
+conversation_state_lock = threading.Lock()
+
+# Where idle sessions are evicted to, and handed off between worker processes
+SESSION_SPOOL_DIR = os.getenv("SESSION_SPOOL_DIR", "session_spool")
+
+def get_session(session_id, create=True):
+    """
+    Look up a session, picking it up from the spool or creating it on first use.
+    Doesn't count as activity - use session_turn() to change the session.
+    """
+    with conversation_state_lock:
+        session = conversation_state.get(session_id)
+        if session is None and SESSION_SPOOL_DIR:
+            session = unspool_session(SESSION_SPOOL_DIR, session_id)
+            if session is not None:
+                conversation_state[session_id] = session
+        if session is None and create:
+            session = conversation_state[session_id] = Session(session_id)
+        return session
+
+@contextmanager
+def session_turn(session_id):
+    """Hold a session's turn lock, marking it active - retries if it was evicted while we waited"""
+    while True:
+        session = get_session(session_id)
+        with session.lock:
+            if session.evicted:
+                continue
+            session.touch()
+            yield session
+            return
+
+# Set on SIGTERM - no new turns start while sessions are spooled for the next worker
+draining = threading.Event()
+# How long spooling waits for turns in flight, inside the dispatcher's 30 s stop timeout
+SPOOL_TURN_TIMEOUT = 20
+
+def draining_response():
+    """503 the dispatcher retries against the replacement worker"""
+    response = jsonify({
+        'success': False,
+        'error': 'Worker is restarting, try again'
+    })
+    response.headers['Retry-After'] = '1'
+    response.headers['X-Worker-Draining'] = '1'
+    return response, 503
+
+def spool_sessions():
+    """Hand every session to the spool, between turns, so the next worker process can pick them up"""
+    draining.set()
+    deadline = time.monotonic() + SPOOL_TURN_TIMEOUT
+    with conversation_state_lock:
+        sessions = list(conversation_state.values())
+    for session in sessions:
+        locked = session.lock.acquire(timeout=max(deadline - time.monotonic(), 0))
+        try:
+            if not locked:
+                print(f"⚠️  Session {session.id} still mid-turn, spooling its last committed state")
+            session.discard_prefetch()
+            spool_session(SESSION_SPOOL_DIR, session)
+        finally:
+            if locked:
+                session.lock.release()
+    if store:
+        store.flush()
+    print(f"📦 Spooled {len(sessions)} sessions")
+
+def stop_worker(*_):
+    """SIGTERM from the dispatcher - spool, abandon speculative LLM calls and exit right away"""
+    try:
+        spool_sessions()
+        if prefetch_pool:
+            prefetch_pool.shutdown(wait=False, cancel_futures=True)
+        if hedger:
+            hedger.shutdown()
+        # Let responses of turns that finished before spooling reach the dispatcher. A turn
+        # still running past SPOOL_TURN_TIMEOUT is cut off after its state was spooled, so the
+        # dispatcher doesn't replay dropped POSTs - the client picks the turn up through sync
+        time.sleep(0.5)
+    finally:
+        # A normal exit joins executor threads, and an LLM call still running there
+        # could outlast the dispatcher's stop timeout - everything worth keeping is spooled
+        os._exit(0)
+
+def start_prefetch(session, agent_index, agent_name):
+    """Speculatively generate the next agent's turn from the committed transcript"""
+    context = session.transcript.context()
+    future = prefetch_pool.submit(breaker.call, generate_turn, agent_index, agent_name, context)
+    session.prefetch = (agent_index, session.cursor, future)
+
+def take_prefetched_turn(session, agent_index):
+    """Result of a valid speculative turn, or None to generate it live"""
+    if profiling.current() is not None:
+        # A profiled turn runs live so its timeline shows the real turn path
+        session.discard_prefetch()
+        return None
+    
+    future = session.take_prefetch(agent_index)
+    if future is None:
+        return None
+    
+    with profiling.span("prefetch_wait"):
+        try:
+            # A failed speculative turn already counted against the breaker - surface it
+            # rather than retrying live and counting the same outage twice
+            return future.result()
+        except CancelledError:
+            return None  # Never ran, generate it live
+
+def persist(session):
+    """Hand new messages of a session to the transcript store"""
+    rows = session.unpersisted()
+    if store:
+        store.record(session.id, session.generation, session.hypothesis, rows)
+
+def sync_payload(session, since):
+    """Compact incremental view of a session for clients holding cursor `since`"""
+    rows, reset, cursor = session.since(since)
+    after_seq = 0 if reset else int(since.rpartition(".")[2])
+    first_seq = rows[0][0] if rows else int(cursor.rpartition(".")[2]) + 1
+    if first_seq > after_seq + 1:
+        # Older messages were compacted away - read them back from the archive, or send the summary
+        older = store.messages(session.id, session.generation, after_seq, first_seq) if store else []
+        if len(older) != first_seq - after_seq - 1:
+            older = [[first_seq - 1, "Summary", session.transcript.summary, rows[0][3] if rows else time.time()]]
+        rows = older + rows
+    return {
+        'cursor': cursor,
+        'reset': reset,
+        'hypothesis': session.hypothesis,
+        'messages': rows
+    }
 
 @app.route('/brainstorm', methods=['POST'])
 def brainstorm():
     """Process brainstorm request - sequential agent flow"""
-    global conversation_state, next_agent_index
-    
     try:
         data = request.json
         hypothesis = data.get('hypothesis', '')
         message = data.get('message', '')
         reset_conversation = data.get('reset', False)
+        session_id = data.get('session_id', DEFAULT_SESSION_ID)
         
-        # Reset conversation if requested or new hypothesis
-        if reset_conversation or (hypothesis and not conversation_state):
-            conversation_state = [f"Hypothesis: {hypothesis}"] if hypothesis else []
-            next_agent_index = 0
-        
-        # Add human message to conversation
-        if message:
-            conversation_state.append(f"You: {message}")
-            next_agent_index = 0  # Reset to Alpha after human message
-        
-        # Format context
-        context = "\n".join(conversation_state)
+        if not valid_session_id(session_id):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid session id'
+            }), 400
         
-        # Define agent order: Alpha -> Beta -> Gamma
-        agents = [
-            (alpha, "Alpha 🔬"),
-            (beta, "Beta ⚡"), 
-            (gamma, "Gamma 🧠")
-        ]
+        routing_mode = data.get('routing')
+        if routing_mode is not None and routing_mode not in ROUTING_MODES:
+            return jsonify({
+                'success': False,
+                'error': f"Unknown routing mode, use one of: {', '.join(ROUTING_MODES)}"
+            }), 400
         
-        # Get response from current agent in sequence
-        if next_agent_index < len(agents) and agents[next_agent_index][0]:
-            agent, agent_name = agents[next_agent_index]
-            
-            task = Task(
-                description=f"""Conversation history: {context}
-                
-                Instructions:
-                - Provide scientifically rigorous response based on your role
-                - Use first principles thinking and expertise across all sciences  
-                - You can mention other agents with @Alpha, @Beta, @Gamma or the human with @You
-                - If someone mentioned you specifically with @, acknowledge and respond to them
-                - Keep it conversational but intellectually substantive (2-3 sentences max for web display)
-                - Agents can challenge each other directly!""",
-                agent=agent,
-                expected_output="A scientifically informed conversational response with potential @ mentions."
-            )
+        with session_turn(session_id) as session:
+            if draining.is_set():
+                return draining_response()
             
-            crew = Crew(
-                agents=[agent],
-                tasks=[task],
-                process=Process.sequential,
-                verbose=False
-            )
+            # Reset conversation if requested or new hypothesis
+            if reset_conversation or (hypothesis and not session.transcript):
+                session.reset(hypothesis)
             
-            result = crew.kickoff(inputs={"context": context})
-            response_text = result.tasks_output[0].raw
+            if routing_mode:
+                session.routing_mode = routing_mode
+            mode = session.routing_mode or ROUTING_MODE
             
-            # Add agent response to conversation
-            conversation_state.append(f"{agent_name}: {response_text}")
+            # Add human message to conversation - supersedes any speculative turn
+            if message:
+                session.discard_prefetch()
+                session.append("You", message)
+                persist(session)
+                # Only the agents the message is addressed to reply
+                session.turn_queue = plan_turns(message, mode)
+                session.chain_budget = ROUTING_MAX_CHAIN
+            elif not session.turn_queue:
+                session.turn_queue = plan_turns('', mode)  # Start another full round
             
-            response = {
-                'success': True,
-                'agent': agent_name,
-                'text': response_text,
-                'timestamp': get_timestamp(),
-                'next_agent_index': next_agent_index + 1,
-                'conversation_complete': next_agent_index >= 2  # All 3 agents responded
-            }
-            
-            next_agent_index += 1
-            if next_agent_index >= 3:
-                next_agent_index = 0  # Ready for next human message
-            
-            return jsonify(response)
-            
-        elif next_agent_index < len(agents):
-            # Demo mode without actual AI
-            demo_responses = [
-                "Ha! That hypothesis is about as stable as a house of cards in a hurricane! Let me explain why physics disagrees...",
-                "The empirical evidence actually supports this hypothesis. Recent studies from MIT demonstrate clear correlations.",
-                "Like two rivers converging, both perspectives reveal truth. The answer lies not in either/or, but in the synthesis of both views."
+            # Define agent order: Alpha -> Beta -> Gamma
+            agents = [
+                (alpha, "Alpha 🔬"),
+                (beta, "Beta ⚡"), 
+                (gamma, "Gamma 🧠")
             ]
             
-            agent_name = agents[next_agent_index][1]
-            response_text = demo_responses[next_agent_index]
+            next_agent_index = session.turn_queue[0]
+            agent, agent_name = agents[next_agent_index]
+            if agent:
+                # Use the turn speculatively started after the previous agent, if still valid
+                response_text = take_prefetched_turn(session, next_agent_index)
+                
+                if response_text is None:
+                    # Format context
+                    with profiling.span("context"):
+                        context = session.transcript.context()
+                    
+                    # Get response from current agent in sequence
+                    with profiling.span("llm"):
+                        response_text = breaker.call(generate_turn, next_agent_index, agent_name, context)
+            else:
+                # Demo mode without actual AI
+                demo_responses = [
+                    "Ha! That hypothesis is about as stable as a house of cards in a hurricane! Let me explain why physics disagrees...",
+                    "The empirical evidence actually supports this hypothesis. Recent studies from MIT demonstrate clear correlations.",
+                    "Like two rivers converging, both perspectives reveal truth. The answer lies not in either/or, but in the synthesis of both views."
+                ]
+                response_text = demo_responses[next_agent_index]
             
             # Add agent response to conversation
-            conversation_state.append(f"{agent_name}: {response_text}")
+            seq = session.append(agent_name, response_text)
+            session.turn_queue.pop(0)
+            persist(session)
+            
+            # In chain mode, agents this reply mentions get a follow-up turn
+            follow_ups = follow_up_turns(next_agent_index, response_text, session.turn_queue, mode, session.chain_budget)
+            session.turn_queue.extend(follow_ups)
+            session.chain_budget -= len(follow_ups)
             
             response = {
                 'success': True,
                 'agent': agent_name,
                 'text': response_text,
                 'timestamp': get_timestamp(),
-                'next_agent_index': next_agent_index + 1,
-                'conversation_complete': next_agent_index >= 2
+                'seq': seq,
+                'next_agent_index': session.turn_queue[0] if session.turn_queue else len(agents),
+                'conversation_complete': not session.turn_queue,  # Everyone addressed has responded
+                'routing': {
+                    'mode': mode,
+                    'mentions': parse_mentions(response_text),
+                    'queue': [agents[index][1] for index in session.turn_queue]
+                },
+                'sync': sync_payload(session, data.get('since'))
             }
             
-            next_agent_index += 1
-            if next_agent_index >= 3:
-                next_agent_index = 0
+            if agent and prefetch_pool and session.turn_queue:
+                # Start the next agent now rather than waiting for the client's follow-up request
+                start_prefetch(session, session.turn_queue[0], agents[session.turn_queue[0]][1])
             
             return jsonify(response)
         
-        else:
-            return jsonify({
-                'success': False,
-                'error': 'All agents have responded. Send a new message to continue.'
-            })
+    except CircuitOpenError as e:
+        # Fail fast while the LLM backend is unhealthy
+        response = jsonify({
+            'success': False,
+            'error': str(e)
+        })
+        response.headers['Retry-After'] = str(int(e.retry_after) + 1)
+        return response, 503
         
     except Exception as e:
         return jsonify({
@@ -201,11 +472,150 @@ def brainstorm():
             'error': str(e)
         })
 
+@app.route('/conversation')
+def conversation():
+    """
+    Incremental conversation sync - returns only messages after ?since=<cursor>.
+    Add ?wait=<seconds> to long-poll until something new arrives.
+    """
+    session_id = request.args.get('session_id', DEFAULT_SESSION_ID)
+    if not valid_session_id(session_id):
+        return jsonify({
+            'success': False,
+            'error': 'Invalid session id'
+        }), 400
+    
+    since = request.args.get('since', '')
+    session = get_session(session_id, create=False)
+    if session is None:
+        return jsonify({
+            'success': True,
+            'cursor': '',
+            'reset': bool(since),
+            'hypothesis': '',
+            'messages': []
+        })
+    session.last_polled = time.time()
+    
+    wait = min(request.args.get('wait', 0, type=float), MAX_LONG_POLL_SECONDS)
+    if wait > 0 and session.cursor == since:
+        session.wait_for_change(since, wait)
+    
+    # Nothing new since the client's copy - let it keep what it has
+    payload = sync_payload(session, since)
+    if request.if_none_match.contains(payload['cursor']):
+        response = app.response_class(status=304)
+    else:
+        response = jsonify({'success': True, **payload})
+    response.set_etag(payload['cursor'])
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/search')
+def search():
+    """Ranked full-text search over stored debates - ?q=<words or "phrase">&page=1&per_page=20"""
+    if store is None:
+        return jsonify({
+            'success': False,
+            'error': 'Transcript search is disabled'
+        }), 404
+    
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 20, type=int), 1), 50)
+    results, has_more = store.search(request.args.get('q', ''), page, per_page)
+    
+    return jsonify({
+        'success': True,
+        'results': results,
+        'page': page,
+        'has_more': has_more
+    })
+
+@app.route('/debates/<int:debate_id>')
+def debate(debate_id):
+    """Full transcript of a stored debate"""
+    found = store.debate(debate_id) if store else None
+    if found is None:
+        return jsonify({
+            'success': False,
+            'error': 'Debate not found'
+        }), 404
+    
+    hypothesis, rows = found
+    return jsonify({
+        'success': True,
+        'debate_id': debate_id,
+        'hypothesis': hypothesis,
+        'messages': rows
+    })
+
+@app.route('/debates/<int:debate_id>/reopen', methods=['POST'])
+def reopen_debate(debate_id):
+    """Load a stored debate into a session so the conversation can continue"""
+    data = request.json or {}
+    session_id = data.get('session_id', DEFAULT_SESSION_ID)
+    if not valid_session_id(session_id):
+        return jsonify({
+            'success': False,
+            'error': 'Invalid session id'
+        }), 400
+    
+    found = store.debate(debate_id) if store else None
+    if found is None:
+        return jsonify({
+            'success': False,
+            'error': 'Debate not found'
+        }), 404
+    
+    hypothesis, rows = found
+    with session_turn(session_id) as session:
+        if draining.is_set():
+            return draining_response()
+        session.restore(hypothesis, rows)
+        # A copy under the new generation - the original may still be growing in another session
+        persist(session)
+        return jsonify({'success': True, **sync_payload(session, data.get('since'))})
+
+# Idle sessions shed memory in stages and rehydrate through get_session() - see session_lifecycle.py
+lifecycle = SessionLifecycle(
+    conversation_state, conversation_state_lock, SESSION_SPOOL_DIR,
+    cache_idle=float(os.getenv("SESSION_CACHE_IDLE_SECONDS", "300")),
+    summarize_idle=float(os.getenv("SESSION_SUMMARIZE_IDLE_SECONDS", "1800")),
+    evict_idle=float(os.getenv("SESSION_EVICT_IDLE_SECONDS", "7200")),
+    keep_recent=int(os.getenv("SESSION_KEEP_RECENT", "12")),
+    high_water_mb=float(os.getenv("MEMORY_HIGH_WATER_MB", "0")),
+    spool_ttl=float(os.getenv("SESSION_SPOOL_TTL_SECONDS", str(7 * 86400))),
+    interval=float(os.getenv("SESSION_SWEEP_INTERVAL", "30")),
+    persist=persist
+)
+if os.getenv("SESSION_LIFECYCLE_ENABLED", "true").lower() == "true":
+    lifecycle.start()
+
 @app.route('/health')
 def health():
-    """Health check endpoint"""
+    """Liveness check - the process is up and serving"""
     return jsonify({'status': 'healthy'})
 
+@app.route('/ready')
+def ready():
+    """Readiness check - reports breaker state so load balancers can drain this instance"""
+    llm_status = breaker.snapshot()
+    is_ready = llm is not None and llm_status['state'] != CircuitBreaker.OPEN
+    
+    return jsonify({
+        'status': 'ready' if is_ready else 'unavailable',
+        'llm': 'configured' if llm is not None else 'demo',
+        'breaker': llm_status,
+        'hedging': hedger.stats() if hedger else None,
+        'sessions': lifecycle.stats()
+    }), 200 if is_ready else 503
+
 if __name__ == '__main__':
+    if os.getenv("WORKER_ID") is not None:
+        # Spool sessions on SIGTERM so a restarted worker carries on where this one stopped -
+        # off the main thread, which keeps accepting and answering 503s until the exit
+        # (connections still in the listen backlog then are reset, not answered)
+        signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=stop_worker, name="stop-worker").start())
+    
     port = int(os.getenv('PORT', 8080))
-    app.run(host='0.0.0.0', port=port, debug=False)
\ No newline at end of file
+    app.run(host=os.getenv('HOST', '0.0.0.0'), port=port, debug=False)
\ No newline at end of file